@@ -0,0 +1,38 @@
+import os, sys
+src = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, src)
+
+import numpy as np
+import time
+
+from dhbw import dasp
+
+def measure(func, *args, repeat=3, **kwargs):
+
+    best = np.inf
+
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+
+    return best
+
+def bench_backend(seconds=60):
+
+    x = dasp.signal.noise(dasp.timeline(seconds))
+
+    for w in [256, 1024, 4096]:
+
+        h = w // 4
+        n = len(dasp.stft.stft(x, w, h))
+
+        for backend in dasp.fft.backend.names():
+
+            a = n / measure(dasp.stft.stft, x, w, h, backend=backend)
+
+            print(f'stft {w:4d}/{h:4d} {backend:>5s}: {a:.3e} frames/s')
+
+if __name__ == '__main__':
+
+    bench_backend()
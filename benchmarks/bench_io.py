@@ -0,0 +1,86 @@
+import os, sys
+src = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, src)
+
+import numpy as np
+import time
+
+from dhbw import dasp
+
+def legacy_decode(data, bits, channels):
+
+    bytes = bits // 8
+    scaler = 2 ** (bits - 1) - 1
+
+    data = np.frombuffer(data, dtype=np.uint8).reshape(-1, bytes)
+    data = np.asarray([
+        int.from_bytes(frame, signed=(bits != 8), byteorder=sys.byteorder)
+        for frame in data])
+    data = data.astype(float).reshape(-1, channels)
+
+    data -= 128 if bits == 8 else 0
+    data = (data + 0.5) / (scaler + 0.5)
+    data = data.clip(-1, +1)
+
+    return data
+
+def legacy_encode(data, bits):
+
+    bytes = bits // 8
+    scaler = 2 ** (bits - 1) - 1
+
+    data = data.clip(-1, +1)
+    data = (data * (scaler + 0.5)) - 0.5
+    data += 128 if bits == 8 else 0
+
+    return b''.join([
+        int(frame).to_bytes(length=bytes, signed=(bits != 8), byteorder=sys.byteorder)
+        for frame in data.ravel()])
+
+def measure(func, *args, repeat=3):
+
+    best = np.inf
+
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+
+    return best
+
+def bench_decode(seconds=10, channels=2):
+
+    n = int(seconds * dasp.SR) * channels
+
+    for bits in [8, 16, 24, 32]:
+
+        data = np.random.bytes(n * bits // 8)
+
+        assert np.array_equal(
+            legacy_decode(data, bits, channels),
+            dasp.io.decode(data, bits, channels))
+
+        a = n / measure(legacy_decode, data, bits, channels, repeat=1)
+        b = n / measure(dasp.io.decode, data, bits, channels)
+
+        print(f'decode {bits:2d} bit: legacy {a:.3e} samples/s, vectorized {b:.3e} samples/s, speedup {b / a:.0f}x')
+
+def bench_encode(seconds=10, channels=2):
+
+    n = int(seconds * dasp.SR) * channels
+
+    for bits in [8, 16, 24, 32]:
+
+        data = np.random.uniform(-1.1, +1.1, n).reshape(-1, channels)
+
+        assert legacy_encode(data, bits) == dasp.io.encode(data, bits)
+
+        a = n / measure(legacy_encode, data, bits, repeat=1)
+        b = n / measure(dasp.io.encode, data, bits)
+
+        print(f'encode {bits:2d} bit: legacy {a:.3e} samples/s, vectorized {b:.3e} samples/s, speedup {b / a:.0f}x')
+
+if __name__ == '__main__':
+
+    bench_decode()
+    bench_encode()
@@ -0,0 +1,104 @@
+import os, sys
+src = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, src)
+
+import numpy as np
+import time
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dhbw import dasp
+
+def legacy_stft(samples, framesize, hopsize):
+
+    frames = sliding_window_view(samples, framesize, writeable=False)[::hopsize]
+    dfts = np.zeros((len(frames), framesize // 2 + 1), complex)
+
+    w = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(framesize) / framesize)
+
+    for i, frame in enumerate(frames):
+        dfts[i] = np.fft.rfft(w * frame, norm='forward')
+
+    return dfts
+
+def legacy_istft(dfts, framesize, hopsize):
+
+    samples = np.zeros((len(dfts) * hopsize + framesize), float)
+    frames = sliding_window_view(samples, framesize, writeable=True)[::hopsize]
+
+    w = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(framesize) / framesize)
+    w *= hopsize / np.sum(w**2)
+
+    for i, dft in enumerate(dfts):
+        frames[i] += w * np.fft.irfft(dft, norm='forward')
+
+    return samples
+
+def measure(func, *args, repeat=3, **kwargs):
+
+    best = np.inf
+
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+
+    return best
+
+def bench_stft(seconds=60):
+
+    x = dasp.signal.noise(dasp.timeline(seconds))
+
+    for w in [256, 1024, 4096]:
+
+        h = w // 4
+        n = len(dasp.stft.stft(x, w, h))
+
+        assert np.array_equal(legacy_stft(x, w, h), dasp.stft.stft(x, w, h))
+
+        a = n / measure(legacy_stft, x, w, h)
+        b = n / measure(dasp.stft.stft, x, w, h)
+
+        print(f'stft {w:4d}/{h:4d}: legacy {a:.3e} frames/s, batched {b:.3e} frames/s, speedup {b / a:.1f}x')
+
+def bench_istft(seconds=60):
+
+    x = dasp.signal.noise(dasp.timeline(seconds))
+
+    for w in [256, 1024, 4096]:
+
+        h = w // 4
+        y = dasp.stft.stft(x, w, h)
+        n = len(y)
+
+        assert np.array_equal(legacy_istft(y, w, h), dasp.stft.istft(y, w, h))
+
+        a = n / measure(legacy_istft, y, w, h)
+        b = n / measure(dasp.stft.istft, y, w, h)
+
+        print(f'istft {w:4d}/{h:4d}: legacy {a:.3e} frames/s, batched {b:.3e} frames/s, speedup {b / a:.1f}x')
+
+def bench_workers(seconds=600):
+
+    x = dasp.signal.noise(dasp.timeline(seconds))
+
+    w = 1024
+    h = w // 4
+    y = dasp.stft.stft(x, w, h)
+    n = len(y)
+
+    a = n / measure(dasp.stft.stft, x, w, h)
+
+    for workers in [1, 2, 4, 8]:
+
+        assert np.array_equal(y, dasp.stft.stft(x, w, h, workers=workers))
+
+        b = n / measure(dasp.stft.stft, x, w, h, workers=workers)
+
+        print(f'stft {w:4d}/{h:4d} with {workers} workers: {b:.3e} frames/s, speedup {b / a:.1f}x on {os.cpu_count()} cpus')
+
+if __name__ == '__main__':
+
+    bench_stft()
+    bench_istft()
+    bench_workers()
@@ -1,18 +1,138 @@
+import functools
 import numpy
+import scipy.fft
 
 from dhbw import dasp
 
 
-def window(name, size):
+class backend:
+    """
+    Registry of interchangeable real-valued FFT implementations,
+    which are used by `fft`, `ifft` and `dasp.stft`.
+
+    Available are numpy (default), scipy and fftw, if pyfftw is installed.
+    Select the backend globally via `backend.name` or per call via the
+    `backend` argument of the corresponding function.
+
+    The numpy and scipy backends rely on the internal plan cache of pocketfft,
+    while the fftw backend enables the pyfftw cache of planned transforms,
+    so that repeated transforms of the same size reuse the existing plans.
+    """
+
+    name = 'numpy'
+    """Name of the backend for all transforms, unless specified per call."""
+
+    workers = None
+    """Number of threads per transform of the scipy and fftw backends."""
+
+    registry = {}
+    """Registered (rfft, irfft) functions by backend name."""
+
+    def register(name, rfft, irfft):
+        """
+        Registers a backend of the specified name.
+
+        Both functions are called with the positional arguments
+        (x, n, axis, norm, workers) in the sense of `numpy.fft.rfft`.
+        """
+
+        backend.registry[name] = (rfft, irfft)
+
+    def names():
+        """
+        Returns the names of all registered backends.
+        """
+
+        return list(backend.registry)
+
+    def get(name=None):
+        """
+        Returns the (rfft, irfft) functions of the specified or global backend.
+        """
+
+        name = name or backend.name
+
+        if name not in backend.registry:
+            raise Exception(f'Invalid or unsupported FFT backend "{name}"!')
+
+        return backend.registry[name]
+
+    def rfft(x, n=None, axis=-1, norm='backward', name=None):
+        """
+        Returns DFT of the specified real-valued array using the specified or global backend.
+        """
+
+        return backend.get(name)[0](x, n, axis, norm, backend.workers)
+
+    def irfft(x, n=None, axis=-1, norm='backward', name=None):
+        """
+        Returns IDFT of the specified complex-valued array using the specified or global backend.
+        """
+
+        return backend.get(name)[1](x, n, axis, norm, backend.workers)
+
+
+backend.register('numpy',
+    lambda x, n, axis, norm, workers: numpy.fft.rfft(x, n, axis, norm),
+    lambda x, n, axis, norm, workers: numpy.fft.irfft(x, n, axis, norm))
+
+backend.register('scipy',
+    lambda x, n, axis, norm, workers: scipy.fft.rfft(x, n, axis, norm, workers=workers),
+    lambda x, n, axis, norm, workers: scipy.fft.irfft(x, n, axis, norm, workers=workers))
+
+try:
+
+    import pyfftw.interfaces.cache
+    import pyfftw.interfaces.numpy_fft
+
+    pyfftw.interfaces.cache.enable()
+
+    backend.register('fftw',
+        lambda x, n, axis, norm, workers: pyfftw.interfaces.numpy_fft.rfft(x, n, axis, norm, threads=workers or 1),
+        lambda x, n, axis, norm, workers: pyfftw.interfaces.numpy_fft.irfft(x, n, axis, norm, threads=workers or 1))
+
+except ImportError:
+
+    pass
+
+
+WINDOWLIMIT = 2**14
+"""Maximum size of memoized windows, larger ones are computed on each call."""
+
+
+def window(name, size, symmetric=True, dtype=float, beta=14):
     """
     Returns coefficients of the specified window and size.
 
+    The returned arrays are read-only. Windows up to `WINDOWLIMIT` coefficients,
+    e.g. of STFT frames, are memoized in a bounded LRU cache, see `window.cache_info()`
+    for the cache statistics and `window.cache_clear()`. Larger windows, e.g. of
+    whole signals of arbitrary length, are not memoized to bound the cache memory.
+
     Parameters
     ----------
     name : string
         Window function name (rectangular, bartlett, blackman, hamming, hanning, kaiser).
     size : int
         Number of window coefficients to compute.
+    symmetric : bool, optional
+        Option whether to compute a symmetric window for filter design,
+        or a periodic window for spectral analysis.
+    dtype : dtype, optional
+        Data type of the window coefficients.
+    beta : float, optional
+        Shape parameter of the kaiser window.
+    """
+
+    if size > WINDOWLIMIT:
+        return coefficients(name, size, symmetric, dtype, beta)
+
+    return memoized(name, size, symmetric, dtype, beta)
+
+
+def coefficients(name, size, symmetric=True, dtype=float, beta=14):
+    """
+    Computes coefficients of the specified window and size, see `window`.
     """
 
     # TODO https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.windows.get_window.html
@@ -20,31 +140,77 @@ def window(name, size):
     assert isinstance(name, str)
     assert isinstance(size, int)
 
+    n = size if symmetric else size + 1
+
     if 'rectangular'.startswith(name.lower()):
-        return numpy.ones(size)
+        w = numpy.ones(n)
 
-    if 'bartlett'.startswith(name.lower()):
-        return numpy.bartlett(size)
+    elif 'bartlett'.startswith(name.lower()):
+        w = numpy.bartlett(n)
 
-    if 'blackman'.startswith(name.lower()):
-        return numpy.blackman(size)
+    elif 'blackman'.startswith(name.lower()):
+        w = numpy.blackman(n)
 
-    if 'hamming'.startswith(name.lower()):
-        return numpy.hamming(size)
+    elif 'hamming'.startswith(name.lower()):
+        w = numpy.hamming(n)
 
-    if 'hanning'.startswith(name.lower()):
-        return numpy.hanning(size)
+    elif 'hanning'.startswith(name.lower()):
+        w = numpy.hanning(n) if symmetric else \
+            0.5 - 0.5 * numpy.cos(2 * numpy.pi * numpy.arange(size) / size)
 
-    if 'kaiser'.startswith(name.lower()):
-        return numpy.kaiser(size, 14)
+    elif 'kaiser'.startswith(name.lower()):
+        w = numpy.kaiser(n, beta)
 
-    raise Exception(f'Invalid or unsupported window "{name}"!')
+    else:
+        raise Exception(f'Invalid or unsupported window "{name}"!')
 
+    w = numpy.asarray(w[:size], dtype=dtype)
+    w.flags.writeable = False
 
-def fft(x, norm=True, window='hanning'):
+    return w
+
+
+memoized = functools.lru_cache(maxsize=128)(coefficients)
+
+window.cache_info = memoized.cache_info
+window.cache_clear = memoized.cache_clear
+
+
+def size(n, pad=None):
+    """
+    Returns the DFT size for the specified number of samples.
+
+    Parameters
+    ----------
+    n : int
+        Number of samples.
+    pad : str, optional
+        Option whether to zero-pad to the next fast composite size ("fast")
+        or to the next power of two ("pot").
+    """
+
+    assert isinstance(n, int)
+
+    if pad is None:
+        return n
+
+    if pad == 'fast':
+        return scipy.fft.next_fast_len(n, real=True)
+
+    if pad == 'pot':
+        return dasp.math.pot(n)
+
+    raise Exception(f'Invalid or unsupported padding "{pad}"!')
+
+
+def fft(x, norm=True, window='hanning', backend=None, n=None, pad=None, axis=-1):
     """
     Returns DFT of the specified real-valued array.
 
+    Multi-dimensional arrays, e.g. a batch of equal sized segments
+    of shape (segments,samples), are transformed along the specified axis
+    all at once.
+
     Parameters
     ----------
     x : array
@@ -53,6 +219,14 @@ def fft(x, norm=True, window='hanning'):
         Option whether to scale the output array by `1/N`.
     window : str, optional
         Window name.
+    backend : str, optional
+        FFT backend name, see `dasp.fft.backend`.
+    n : int, optional
+        DFT size, defaults to the input size.
+    pad : str, optional
+        Option whether to zero-pad the windowed input to a fast DFT size, see `size`.
+    axis : int, optional
+        Sample axis, which is replaced by the frequency axis.
 
     Returns
     -------
@@ -60,15 +234,20 @@ def fft(x, norm=True, window='hanning'):
         Complex output array.
     """
 
+    x = numpy.asarray(x)
+    m = x.shape[axis]
+    n = dasp.fft.size(n or m, pad)
+
     if window is not None:
-        x = x * dasp.fft.window(window, len(x))
+        # broadcast the window along the sample axis
+        x = x * dasp.fft.window(window, m).reshape([-1 if i == axis % x.ndim else 1 for i in range(x.ndim)])
 
-    y = numpy.fft.rfft(x, norm=('forward' if norm else 'backward'))
+    y = dasp.fft.backend.rfft(x, n, axis, norm=('forward' if norm else 'backward'), name=backend)
 
     return y
 
 
-def ifft(x, norm=True):
+def ifft(x, norm=True, backend=None, n=None, axis=-1):
     """
     Returns IDFT of the specified complex-valued array.
 
@@ -78,6 +257,12 @@ def ifft(x, norm=True):
         Complex input array.
     norm : bool, optional
         Option whether to scale the output array by `1*N`.
+    backend : str, optional
+        FFT backend name, see `dasp.fft.backend`.
+    n : int, optional
+        DFT size, defaults to the even size `2*(len(x)-1)`.
+    axis : int, optional
+        Frequency axis, which is replaced by the sample axis.
 
     Returns
     -------
@@ -85,12 +270,12 @@ def ifft(x, norm=True):
         Real output array.
     """
 
-    y = numpy.fft.irfft(x, norm=('forward' if norm else 'backward'))
+    y = dasp.fft.backend.irfft(x, n, axis, norm=('forward' if norm else 'backward'), name=backend)
 
     return y
 
 
-def abs(x, y, db=True, window='hanning'):
+def abs(x, y, db=True, window='hanning', pad=None):
     """
     Returns DFT frequencies and corresponding absolute values
     of the specified timeline x and signal amplitudes y.
@@ -107,6 +292,8 @@ def abs(x, y, db=True, window='hanning'):
         Express frequencies in decibel.
     window : str, optional
         Window name.
+    pad : str, optional
+        Option whether to zero-pad to a fast DFT size, see `size`.
 
     Returns
     -------
@@ -116,18 +303,12 @@ def abs(x, y, db=True, window='hanning'):
         Corresponding absolute values.
     """
 
-    sr = x if numpy.isscalar(x) \
-           else int(len(x) / numpy.ptp(x))  # 1 / (duration / samples)
-
-    dft = dasp.fft.fft(y, window=window)
+    spectrum = Spectrum(x, y, window=window, pad=pad)
 
-    freqs = numpy.fft.rfftfreq(len(x), 1 / sr)
-    power = dasp.math.abs(dft, db=db)
+    return spectrum.freqs, spectrum.db if db else spectrum.abs
 
-    return freqs, power
 
-
-def arg(x, y, wrap=None, window='hanning'):
+def arg(x, y, wrap=None, window='hanning', pad=None):
     """
     Returns DFT frequencies and corresponding argument values
     of the specified timeline x and signal amplitudes y.
@@ -144,6 +325,8 @@ def arg(x, y, wrap=None, window='hanning'):
         Explicitly wrap or unwrap argument values.
     window : str, optional
         Window name.
+    pad : str, optional
+        Option whether to zero-pad to a fast DFT size, see `size`.
 
     Returns
     -------
@@ -153,12 +336,129 @@ def arg(x, y, wrap=None, window='hanning'):
         Corresponding argument values.
     """
 
-    sr = x if numpy.isscalar(x) \
-           else int(len(x) / numpy.ptp(x))  # 1 / (duration / samples)
+    spectrum = Spectrum(x, y, window=window, pad=pad)
+
+    return spectrum.freqs, spectrum.phase(wrap)
+
+
+def samplerate(x):
+    """
+    Returns the sample rate of the specified timeline,
+    or the specified sample rate itself.
+
+    Parameters
+    ----------
+    x : array or float
+        Timeline or sample rate.
+    """
+
+    if numpy.isscalar(x):
+        return x
+
+    assert len(x) > 1
+
+    # only the first time step is needed, instead of the whole timeline duration
+    return int(numpy.round(1 / (x[1] - x[0])))
+
+
+class Spectrum:
+    """
+    DFT of the specified timeline x and signal amplitudes y,
+    or of each row of a 2D signal array of shape (segments,samples).
+
+    The DFT is computed only once on first access,
+    as well as each derived property.
+
+    Parameters
+    ----------
+    x : array or float
+        Timeline or sample rate.
+    y : array
+        Input signal amplitudes.
+    window : str, optional
+        Window name.
+    pad : str, optional
+        Option whether to zero-pad to a fast DFT size, see `size`.
+    backend : str, optional
+        FFT backend name, see `dasp.fft.backend`.
+    """
+
+    def __init__(self, x, y, window='hanning', pad=None, backend=None):
+
+        self.sr = samplerate(x)
+        self.size = dasp.fft.size(numpy.shape(y)[-1], pad)
+
+        self.y = y
+        self.window = window
+        self.backend = backend
+
+    @functools.cached_property
+    def dft(self):
+        """
+        Complex DFT values.
+        """
+
+        return dasp.fft.fft(self.y, window=self.window, backend=self.backend, n=self.size)
+
+    @functools.cached_property
+    def freqs(self):
+        """
+        DFT frequencies in hertz.
+        """
+
+        return numpy.fft.rfftfreq(self.size, 1 / self.sr)
+
+    @functools.cached_property
+    def abs(self):
+        """
+        Absolute DFT values.
+        """
+
+        return dasp.math.abs(self.dft, db=False)
+
+    @functools.cached_property
+    def db(self):
+        """
+        Absolute DFT values in decibel.
+        """
+
+        return dasp.math.db(self.abs)
+
+    @functools.cached_property
+    def arg(self):
+        """
+        Argument DFT values.
+        """
+
+        return dasp.math.arg(self.dft)
+
+    @functools.cached_property
+    def wrapped(self):
+        """
+        Argument DFT values in 2*pi range.
+        """
+
+        return dasp.math.wrap(self.arg)
+
+    @functools.cached_property
+    def unwrapped(self):
+        """
+        Unwrapped argument DFT values.
+        """
+
+        return dasp.math.unwrap(self.arg)
+
+    def phase(self, wrap=None):
+        """
+        Returns the argument DFT values in the sense of `dasp.math.arg`.
 
-    dft = dasp.fft.fft(y, window=window)
+        Parameters
+        ----------
+        wrap : bool, optional
+            Explicitly wrap or unwrap argument values.
+        """
 
-    freqs = numpy.fft.rfftfreq(len(x), 1 / sr)
-    phase = dasp.math.arg(dft, wrap=wrap)
+        if wrap is None:
+            return self.arg
 
-    return freqs, phase
+        return self.wrapped if wrap else self.unwrapped
@@ -1,12 +1,32 @@
+import asyncio
+import builtins
+import concurrent.futures
+import functools
+import glob
+import hashlib
+import json
 import numpy
 import os
+import struct
 import subprocess
-import sys
-import wave
+import tempfile
 
 from dhbw import dasp
 
 
+PCM = 0x0001
+"""Integer PCM format tag."""
+
+FLOAT = 0x0003
+"""IEEE floating point format tag."""
+
+EXTENSIBLE = 0xFFFE
+"""Extensible format tag, which wraps the actual format tag into a subformat GUID."""
+
+GUID = b'\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+"""Common subformat GUID suffix following the actual format tag."""
+
+
 def display(data, sr=None):
     """
     Displays the specified audio data or file in a Python notebook.
@@ -24,13 +44,7 @@ def display(data, sr=None):
 
     if isinstance(data, str):
 
-        path = str(data)
-
-        if path.startswith('~'):
-            path = os.path.expanduser(path)
-
-        if not path.lower().endswith('.wav'):
-            path += '.wav'
+        path = wavpath(str(data))
 
         return IPython.display.Audio(filename=path)
 
@@ -57,11 +71,7 @@ def open(path, cmd='audacity', shell=False, wait=False):
         If true, wait for child process to terminate.
     """
 
-    if path.startswith('~'):
-        path = os.path.expanduser(path)
-
-    if not path.lower().endswith('.wav'):
-        path += '.wav'
+    path = wavpath(path)
 
     process = subprocess.Popen([cmd, path], shell=shell)
 
@@ -90,7 +100,498 @@ def play(path, cmd='play', shell=False, wait=True):
     return open(path, cmd=cmd, shell=shell, wait=wait)
 
 
-def read(path):
+class Header:
+    """
+    Essential .wav file header fields.
+    """
+
+    def __init__(self, sr, bits, channels, offset, size, tag=PCM):
+
+        self.tag = tag
+        """Sample format tag (PCM or FLOAT)."""
+
+        self.sr = sr
+        """Sample rate in hertz."""
+
+        self.bits = bits
+        """Sample bitwidth."""
+
+        self.channels = channels
+        """Number of interleaved channels."""
+
+        self.offset = offset
+        """Byte offset of the sample data within the file."""
+
+        self.size = size
+        """Byte size of the sample data."""
+
+    @property
+    def frames(self):
+        """
+        Number of samples per channel.
+        """
+
+        return self.size // (self.channels * self.bits // 8)
+
+    @property
+    def duration(self):
+        """
+        Duration in seconds.
+        """
+
+        return self.frames / self.sr
+
+    @property
+    def length(self):
+        """
+        Number of samples per channel covered by the complete `dasp.timeline`.
+        """
+
+        n = int(numpy.ceil((self.frames / self.sr) / (1 / self.sr)))
+
+        return min(n, self.frames)
+
+    def __repr__(self):
+
+        return f'{type(self).__name__}({vars(self)})'
+
+
+def wavpath(path):
+    """
+    Returns the user expanded file path with the .wav extension.
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+    """
+
+    if path.startswith('~'):
+        path = os.path.expanduser(path)
+
+    if not path.lower().endswith('.wav'):
+        path += '.wav'
+
+    return path
+
+
+def parse(file):
+    """
+    Parses the RIFF header of the specified binary file object
+    and leaves the file position at the beginning of the sample data.
+
+    Parameters
+    ----------
+    file : file object
+        Binary file object opened for reading.
+
+    Returns
+    -------
+    header : Header
+        Parsed .wav file header.
+    """
+
+    filesize = os.fstat(file.fileno()).st_size
+
+    riff, _, form = struct.unpack('<4sI4s', file.read(12))
+
+    if riff not in [b'RIFF', b'RF64'] or form != b'WAVE':
+        raise Exception(f'Invalid or unsupported file format "{riff.decode(errors="replace")}"!')
+
+    fmt = None
+    ds64 = None
+
+    while True:
+
+        chunk = file.read(8)
+
+        if len(chunk) < 8:
+            raise Exception('Missing data chunk!')
+
+        id, size = struct.unpack('<4sI', chunk)
+
+        if id == b'ds64':
+            ds64 = struct.unpack('<QQQ', file.read(24))  # riff, data and sample count
+            file.seek(size - 24 + size % 2, 1)
+            continue
+
+        if id == b'fmt ':
+            fmt = file.read(size)
+            file.seek(size % 2, 1)
+            continue
+
+        if id == b'data':
+            if riff == b'RF64' and size == 0xFFFFFFFF:
+                if ds64 is None:
+                    raise Exception('Missing ds64 chunk!')
+                size = ds64[1]
+            break
+
+        file.seek(size + size % 2, 1)  # skip unknown chunk including pad byte
+
+    if fmt is None:
+        raise Exception('Missing fmt chunk!')
+
+    tag, channels, sr, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+
+    if tag == EXTENSIBLE and len(fmt) >= 40:
+        tag = struct.unpack('<H', fmt[24:26])[0]
+
+    if tag not in [PCM, FLOAT]:
+        raise Exception(f'Invalid or unsupported format tag "{tag}"!')
+
+    if bits not in ([8, 16, 24, 32] if tag == PCM else [32, 64]):
+        raise Exception(f'Invalid or unsupported bitwidth "{bits}"!')
+
+    offset = file.tell()
+    size = min(size, filesize - offset)  # tolerate truncated files
+
+    return Header(sr=sr, bits=bits, channels=channels, offset=offset, size=size, tag=tag)
+
+
+def mmap(path):
+    """
+    Maps the sample data of a .wav file into memory without reading or decoding it.
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+
+    Returns
+    -------
+    data : ndarray
+        Read-only zero-copy view of the raw little-endian samples,
+        of shape (samples,channels) or (samples,channels,3) for 24 bit PCM.
+        Use `decode` to convert a slice of it into normalized samples.
+    header : Header
+        Parsed .wav file header.
+    """
+
+    path = wavpath(path)
+
+    with builtins.open(path, 'rb') as file:
+        header = parse(file)
+
+    bits = header.bits
+    shape = (header.frames, header.channels)
+    dtype = numpy.dtype(f'<f{bits // 8}' if header.tag == FLOAT else
+                        numpy.uint8 if bits in [8, 24] else f'<i{bits // 8}')
+
+    if header.tag == PCM and bits == 24:
+        shape += (3,)
+
+    if not header.frames:
+        return numpy.empty(shape, dtype), header
+
+    data = numpy.memmap(path, dtype=dtype, mode='r', offset=header.offset, shape=shape)
+
+    return data, header
+
+
+def info(path):
+    """
+    Reads the header of a .wav file without reading the sample data.
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+
+    Returns
+    -------
+    header : Header
+        Parsed .wav file header.
+    """
+
+    path = wavpath(path)
+
+    with builtins.open(path, 'rb') as file:
+        return parse(file)
+
+
+def index(path, pattern='**/*.wav', sidecar='.dasp.json', refresh=True):
+    """
+    Builds or refreshes the header index of all .wav files in the specified directory.
+
+    The index is stored in a sidecar file within the directory.
+    On refresh, only new or modified files are parsed again.
+    Without refresh, the stored index is returned as is,
+    so that no directory traversal is necessary.
+
+    Parameters
+    ----------
+    path : string
+        Directory path.
+    pattern : string, optional
+        Glob pattern of the files to index, relative to the directory.
+    sidecar : string, optional
+        Index file name, relative to the directory.
+    refresh : bool, optional
+        Option whether to update the stored index or only build it if missing.
+
+    Returns
+    -------
+    index : dict
+        Header fields (sr, bits, channels, tag, frames, duration, size, mtime)
+        per file path relative to the directory.
+    """
+
+    if path.startswith('~'):
+        path = os.path.expanduser(path)
+
+    sidecar = os.path.join(path, sidecar)
+
+    try:
+        with builtins.open(sidecar, 'r') as file:
+            previous = json.load(file)
+    except (OSError, ValueError):
+        previous = None
+
+    if previous is not None and not refresh:
+        return previous
+
+    previous = previous or {}
+    index = {}
+
+    for filepath in glob.glob(os.path.join(path, pattern), recursive=True):
+
+        key = os.path.relpath(filepath, path)
+        stat = os.stat(filepath)
+        entry = previous.get(key)
+
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime_ns:
+
+            try:
+                header = info(filepath)
+            except Exception as error:
+                dasp.log.echo(f'Skipping file {filepath} {dict(error=error)}')
+                continue
+
+            entry = dict(sr=header.sr, bits=header.bits, channels=header.channels, tag=header.tag,
+                         frames=header.frames, duration=header.duration,
+                         size=stat.st_size, mtime=stat.st_mtime_ns)
+
+        index[key] = entry
+
+    if index != previous:
+
+        dasp.log.echo(f'Writing index file {sidecar} {dict(n=len(index))}')
+
+        with builtins.open(sidecar, 'w') as file:
+            json.dump(index, file)
+
+    return index
+
+
+def select(index, sr=None, bits=None, channels=None, duration=None):
+    """
+    Selects the files matching the specified header fields from an `index`.
+
+    Parameters
+    ----------
+    index : dict
+        File index.
+    sr : integer, optional
+        Sample rate in hertz.
+    bits : integer, optional
+        Sample bitwidth.
+    channels : integer, optional
+        Number of channels.
+    duration : float, tuple, optional
+        Minimum duration or (min, max) duration limits in seconds.
+
+    Returns
+    -------
+    paths : list
+        Sorted matching file paths relative to the indexed directory.
+    """
+
+    if isinstance(duration, (list, tuple)):
+        dmin, dmax = duration
+    else:
+        dmin, dmax = duration, None
+
+    return sorted(
+        key for key, entry in index.items()
+        if (sr is None or entry['sr'] == sr)
+        and (bits is None or entry['bits'] == bits)
+        and (channels is None or entry['channels'] == channels)
+        and (dmin is None or entry['duration'] >= dmin)
+        and (dmax is None or entry['duration'] <= dmax))
+
+
+def decode(data, bits, channels=1, tag=PCM, dtype=None):
+    """
+    Converts raw little-endian sample bytes into normalized samples.
+
+    Integer PCM samples are scaled into range [-1,+1],
+    unless an integer output type is requested.
+    IEEE floating point samples are returned as is,
+    i.e. as a zero-copy view of the specified buffer.
+
+    Parameters
+    ----------
+    data : bytes, bytearray, memoryview, ndarray
+        Raw interleaved sample bytes or a contiguous slice of the `mmap` view.
+    bits : integer
+        Sample bitwidth (8, 16, 24 or 32 for PCM, 32 or 64 for FLOAT).
+    channels : integer, optional
+        Number of interleaved channels.
+    tag : integer, optional
+        Sample format tag (PCM or FLOAT).
+    dtype : dtype, optional
+        Output sample type, e.g. float32 or float64.
+        Integer types yield the signed PCM sample values scaled to the
+        full range of the type, e.g. 24 bit samples shifted left by 8 bit
+        for int32 or right by 8 bit for int16.
+        Defaults to float64 for PCM and to the stored type for FLOAT.
+
+    Returns
+    -------
+    data : ndarray
+        Sample array of shape (samples,channels).
+    """
+
+    assert tag in [PCM, FLOAT]
+
+    if tag == FLOAT:
+        assert bits in [32, 64]
+        assert dtype is None or numpy.dtype(dtype).kind == 'f', 'Expected float output type for FLOAT samples!'
+        data = numpy.frombuffer(data, dtype=f'<f{bits // 8}')
+        data = data.astype(dtype, copy=False) if dtype is not None else data
+        return data.reshape(-1, channels)
+
+    assert bits in [8, 16, 24, 32]
+    scaler = 2 ** (bits - 1) - 1
+
+    dtype = numpy.dtype(dtype if dtype is not None else float)
+    assert dtype.kind in 'fi'
+
+    if bits == 8:
+        data = numpy.frombuffer(data, dtype=numpy.uint8)
+    elif bits == 24:
+        # place each 3 byte sample into the upper bytes of an int32
+        # and let the arithmetic right shift do the sign extension
+        data = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 3)
+        temp = numpy.zeros((len(data), 4), dtype=numpy.uint8)
+        temp[:, 1:] = data
+        data = temp.view('<i4').ravel() >> 8
+    else:
+        data = numpy.frombuffer(data, dtype=f'<i{bits // 8}')
+
+    if dtype.kind == 'i':
+        if bits == 8:
+            data = data.astype(numpy.int16) - 128  # to signed 8bit
+        # align the most significant bits instead of wrapping around
+        if dtype.itemsize * 8 < bits:
+            data = data >> (bits - dtype.itemsize * 8)
+        data = data.astype(dtype, copy=False)
+        if dtype.itemsize * 8 > bits:
+            data = data << (dtype.itemsize * 8 - bits)
+        return data.reshape(-1, channels)
+
+    data = data.astype(dtype)
+    data -= 128 if bits == 8 else 0  # to signed 8bit
+    data += 0.5
+    data /= scaler + 0.5
+    data = data.clip(-1, +1, out=data)
+
+    return data.reshape(-1, channels)
+
+
+def encode(data, bits, tag=PCM):
+    """
+    Converts normalized samples into raw little-endian sample bytes.
+
+    Floating point samples are clipped to range [-1,+1] for PCM
+    and stored as is for FLOAT. Integer samples are considered as
+    signed PCM sample values in the full range of their type,
+    which are shifted to the specified bitwidth, see `decode`.
+
+    Parameters
+    ----------
+    data : ndarray
+        Sample array of shape (samples,) or (samples,channels).
+    bits : integer
+        Sample bitwidth (8, 16, 24 or 32 for PCM, 32 or 64 for FLOAT).
+    tag : integer, optional
+        Sample format tag (PCM or FLOAT).
+
+    Returns
+    -------
+    data : bytes
+        Raw interleaved sample bytes.
+    """
+
+    assert tag in [PCM, FLOAT]
+
+    data = numpy.asarray(data)
+
+    if tag == FLOAT:
+        assert bits in [32, 64]
+        assert data.dtype.kind == 'f', 'Expected float input type for FLOAT samples!'
+        return data.astype(f'<f{bits // 8}', copy=False).tobytes()
+
+    assert bits in [8, 16, 24, 32]
+    scaler = 2 ** (bits - 1) - 1
+
+    if data.dtype.kind == 'i':
+        # align the most significant bits
+        if data.dtype.itemsize * 8 > bits:
+            data = data >> (data.dtype.itemsize * 8 - bits)
+        elif data.dtype.itemsize * 8 < bits:
+            data = data.astype(numpy.int64) << (bits - data.dtype.itemsize * 8)
+        if bits == 8:
+            return (data.astype(numpy.int16) + 128).astype(numpy.uint8).tobytes()  # to unsigned 8bit
+    else:
+        data = numpy.clip(data, -1, +1, dtype=float)
+        data *= scaler + 0.5
+        data -= 0.5
+
+    if bits == 8:
+        data += 128  # to unsigned 8bit
+        return data.astype(numpy.uint8).tobytes()
+
+    if bits == 24:
+        # keep the lower 3 bytes of each little-endian int32
+        data = data.astype('<i4').reshape(-1, 1).view(numpy.uint8)
+        return data[:, :3].tobytes()
+
+    return data.astype(f'<i{bits // 8}').tobytes()
+
+
+def span(start, stop, n, sr):
+    """
+    Converts the specified start and stop values into a valid sample index range.
+
+    Parameters
+    ----------
+    start : integer, float, None
+        First sample index (integer) or time in seconds (float).
+    stop : integer, float, None
+        Sample index (integer) or time in seconds (float) to stop at.
+    n : integer
+        Total number of samples.
+    sr : integer
+        Sample rate in hertz.
+
+    Returns
+    -------
+    start : integer
+        First sample index.
+    stop : integer
+        Sample index to stop at, not less than start.
+    """
+
+    start = int(round(start * sr)) if isinstance(start, (float, numpy.floating)) else start
+    stop = int(round(stop * sr)) if isinstance(stop, (float, numpy.floating)) else stop
+    start, stop, _ = slice(start, stop).indices(n)
+
+    return start, max(start, stop)
+
+
+def read(path, start=None, stop=None, dtype=None, cached=None):
     """
     Reads a .wav file.
 
@@ -98,6 +599,15 @@ def read(path):
     ----------
     path : string
         File path with or without the .wav extension.
+    start : integer, float, optional
+        First sample index (integer) or time in seconds (float) to read.
+    stop : integer, float, optional
+        Sample index (integer) or time in seconds (float) to stop reading at.
+    dtype : dtype, optional
+        Sample type, e.g. float32, float64 or an integer type for raw PCM values.
+        Defaults to float64 for PCM and to the stored type for IEEE float files.
+    cached : bool, optional
+        Option whether to use the persistent `cache`, defaults to `cache.enable`.
 
     Returns
     -------
@@ -109,42 +619,402 @@ def read(path):
         Sample rate in hertz.
     """
 
-    if path.startswith('~'):
-        path = os.path.expanduser(path)
+    path = wavpath(path)
 
-    if not path.lower().endswith('.wav'):
-        path += '.wav'
+    if cached if cached is not None else cache.enable:
 
-    with wave.open(path, 'rb') as file:
-        sr = file.getframerate()
-        bytes = file.getsampwidth()
-        channels = file.getnchannels()
-        data = file.readframes(file.getnframes())
+        hit = cache.load(path, dtype)
 
-    dasp.log.echo(f'Reading data from file {path} {dict(sr=sr, bytes=bytes, channels=channels, n=len(data))}')
+        if hit is not None:
 
-    assert bytes in [1, 2, 3, 4]
-    bits = bytes * 8
-    scaler = 2 ** (bits - 1) - 1
+            data, sr = hit
+            start, stop = span(start, stop, len(data), sr)
 
-    data = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, bytes)
-    data = numpy.asarray([
-        int.from_bytes(frame, signed=(bits != 8), byteorder=sys.byteorder)
-        for frame in data])
-    data = data.astype(float).reshape(-1, channels)
+            dasp.log.echo(f'Reading cached data of file {path} {dict(sr=sr, start=start, stop=stop)}')
 
-    data -= 128 if bits == 8 else 0  # to signed 8bit
-    data = (data + 0.5) / (scaler + 0.5)
-    data = data.clip(-1, +1)
+            return data[start:stop], numpy.arange(start, stop) * (1 / sr), sr
+
+        if start is None and stop is None:
+
+            data, time, sr = read(path, dtype=dtype, cached=False)
+            cache.save(path, dtype, data, sr)
+
+            return data, time, sr
+
+    with builtins.open(path, 'rb') as file:
+
+        header = parse(file)
+        start, stop, offset, size = locate(header, start, stop)
+
+        data = bytearray(size)
+
+        file.seek(offset)
+        file.readinto(data)
+
+    dasp.log.echo(f'Reading data from file {path} {dict(sr=header.sr, bytes=header.bits // 8, channels=header.channels, n=len(data))}')
+
+    return unpack(data, header, start, stop, dtype)
+
+
+def locate(header, start=None, stop=None):
+    """
+    Locates the specified sample range within the .wav file.
+
+    Parameters
+    ----------
+    header : Header
+        Parsed .wav file header.
+    start : integer, float, optional
+        First sample index (integer) or time in seconds (float).
+    stop : integer, float, optional
+        Sample index (integer) or time in seconds (float) to stop at.
+
+    Returns
+    -------
+    start : integer
+        First sample index.
+    stop : integer
+        Sample index to stop at.
+    offset : integer
+        Byte offset of the first sample within the file.
+    size : integer
+        Byte size of the sample range.
+    """
+
+    start, stop = span(start, stop, header.length, header.sr)
+    blockalign = header.bits // 8 * header.channels
+
+    return start, stop, header.offset + start * blockalign, (stop - start) * blockalign
+
+
+def unpack(data, header, start, stop, dtype=None):
+    """
+    Decodes the sample bytes of the located sample range.
+
+    Parameters
+    ----------
+    data : bytes, bytearray, memoryview
+        Raw interleaved sample bytes.
+    header : Header
+        Parsed .wav file header.
+    start : integer
+        First sample index.
+    stop : integer
+        Sample index to stop at.
+    dtype : dtype, optional
+        Sample type, see `decode`.
+
+    Returns
+    -------
+    data : ndarray
+        Sample array of shape (samples,) or (samples,channels).
+    time : ndarray
+        Corresponding timeline array.
+    sr : integer
+        Sample rate in hertz.
+    """
+
+    sr = header.sr
+    channels = header.channels
+
+    data = decode(data, header.bits, channels, header.tag, dtype)
 
-    time = dasp.timeline(len(data) / sr, sr=sr)
-    data = data[:len(time), ...]
-    data = data.flatten() if channels == 1 else data
+    # same as dasp.timeline(n / sr, sr)[start:stop], but without the whole timeline
+    time = numpy.arange(start, stop) * (1 / sr)
+    data = data.ravel() if channels == 1 else data
 
     return data, time, sr
 
 
-def write(path, data, sr=None, bits=24):
+class cache:
+    """
+    Persistent cache of decoded .wav files used by `read`.
+
+    Each entry is stored as a .npy file, which is keyed by the absolute path,
+    size and modification time of the .wav file as well as the sample type.
+    Cache hits are memory-mapped, the least recently used entries are evicted
+    as soon as the total size exceeds the specified budget.
+    """
+
+    enable = False
+    """Enable or disable the cache for all `read` calls."""
+
+    path = os.path.join('~', '.cache', 'dhbw')
+    """Cache directory path."""
+
+    budget = 2**30
+    """Maximum total cache size in bytes."""
+
+    hits = 0
+    """Number of cache hits."""
+
+    misses = 0
+    """Number of cache misses."""
+
+    def directory():
+        """
+        Returns the expanded cache directory path and creates it if necessary.
+        """
+
+        path = os.path.expanduser(cache.path)
+        os.makedirs(path, exist_ok=True)
+
+        return path
+
+    def key(path, dtype=None):
+        """
+        Returns the cache key of the specified .wav file and sample type.
+        """
+
+        stat = os.stat(path)
+        dtype = numpy.dtype(dtype).str if dtype is not None else None
+        key = repr((os.path.abspath(path), stat.st_size, stat.st_mtime_ns, dtype))
+
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def load(path, dtype=None):
+        """
+        Returns the memory-mapped cache entry (data, sr) or None.
+        """
+
+        key = cache.key(path, dtype)
+        hits = glob.glob(os.path.join(cache.directory(), f'{key}.*.npy'))
+
+        if not hits:
+            cache.misses += 1
+            return None
+
+        try:
+            data = numpy.load(hits[0], mmap_mode='r')
+            sr = int(os.path.basename(hits[0]).split('.')[-2])
+            os.utime(hits[0])  # mark as recently used
+        except (OSError, ValueError):
+            cache.misses += 1
+            return None
+
+        cache.hits += 1
+
+        return data, sr
+
+    def save(path, dtype, data, sr):
+        """
+        Stores the decoded data as a cache entry and evicts old entries if necessary.
+        """
+
+        key = cache.key(path, dtype)
+        directory = cache.directory()
+
+        # write a temporary file first, so concurrent readers never see partial entries
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=directory)
+
+        with os.fdopen(fd, 'wb') as file:
+            numpy.save(file, data)
+
+        os.replace(temp, os.path.join(directory, f'{key}.{sr}.npy'))
+
+        cache.evict()
+
+    def evict():
+        """
+        Removes the least recently used entries until the total size fits into the budget.
+        """
+
+        entries = []
+
+        for path in glob.glob(os.path.join(cache.directory(), '*.npy')):
+            try:
+                stat = os.stat(path)
+                entries += [(stat.st_mtime_ns, stat.st_size, path)]
+            except OSError:
+                pass
+
+        size = sum(entry[1] for entry in entries)
+
+        for _, bytes, path in sorted(entries):
+
+            if size <= cache.budget:
+                break
+
+            try:
+                os.remove(path)
+                size -= bytes
+            except OSError:
+                pass
+
+    def clear():
+        """
+        Removes all entries and resets the counters.
+        """
+
+        for path in glob.glob(os.path.join(cache.directory(), '*.npy')):
+            os.remove(path)
+
+        cache.hits = 0
+        cache.misses = 0
+
+    def stats():
+        """
+        Returns the cache statistics.
+        """
+
+        sizes = [os.path.getsize(path) for path in glob.glob(os.path.join(cache.directory(), '*.npy'))]
+
+        return dict(hits=cache.hits, misses=cache.misses, entries=len(sizes), bytes=sum(sizes), budget=cache.budget)
+
+
+def read_many(paths, workers=None, processes=False, ordered=True, stack=False, **kwargs):
+    """
+    Reads multiple .wav files concurrently.
+
+    Failed files do not abort the batch, but are reported separately.
+
+    Parameters
+    ----------
+    paths : string, list
+        List of file paths or a glob pattern like "~/clips/**/*.wav".
+    workers : integer, optional
+        Maximum number of concurrent workers, defaults to the number of processors.
+    processes : bool, optional
+        Option whether to use a process pool instead of a thread pool.
+    ordered : bool, optional
+        Option whether to return all results in input order at once,
+        or to iterate over the results as they complete.
+    stack : bool, optional
+        Option whether to stack the equal length clips into one array.
+    kwargs : optional
+        Further `read` arguments, e.g. start, stop or dtype.
+
+    Returns
+    -------
+    results : list, tuple, generator
+        Ordered list of `read` results with None for failed files,
+        or a single (data, time, sr) tuple of stacked clips of shape (files,samples,...),
+        which is (None, None, None) if all files failed,
+        or a generator of (path, result or exception) pairs as they complete.
+    errors : dict
+        Exception per failed file path, if ordered.
+    """
+
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(os.path.expanduser(paths), recursive=True))
+
+    paths = list(paths)
+
+    assert ordered or not stack
+
+    dasp.log.echo(f'Reading data from {len(paths)} files {dict(workers=workers, processes=processes)}')
+
+    executor = concurrent.futures.ProcessPoolExecutor(workers) if processes else \
+               concurrent.futures.ThreadPoolExecutor(workers)
+
+    futures = {executor.submit(read, path, **kwargs): path for path in paths}
+
+    def result(future):
+        error = future.exception()
+        return error if error is not None else future.result()
+
+    if not ordered:
+
+        def iterate():
+            with executor:
+                for future in concurrent.futures.as_completed(futures):
+                    yield futures[future], result(future)
+
+        return iterate()
+
+    with executor:
+        results = [result(future) for future in futures]
+
+    errors = {path: error for path, error in zip(paths, results) if isinstance(error, BaseException)}
+    results = [None if isinstance(result, BaseException) else result for result in results]
+
+    if stack:
+
+        results = [result for result in results if result is not None]
+
+        if not results:
+            return (None, None, None), errors
+
+        if len(set((result[0].shape, result[2]) for result in results)) > 1:
+            raise Exception('Unable to stack clips of different shape or sample rate!')
+
+        data = numpy.stack([result[0] for result in results])
+        time = results[0][1]
+        sr = results[0][2]
+
+        return (data, time, sr), errors
+
+    return results, errors
+
+
+def stream(path, blocksize, overlap=0, pad=False, dtype=None):
+    """
+    Reads a .wav file block by block.
+
+    Consecutive blocks start `blocksize - overlap` samples apart.
+    For a frame-aligned STFT, choose `overlap = framesize - hopsize`
+    and `blocksize - overlap` as a multiple of the hopsize, then the
+    `dasp.stft.stft` frames of all blocks equal those of the whole signal.
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+    blocksize : integer
+        Number of samples per block.
+    overlap : integer, optional
+        Number of samples shared by consecutive blocks.
+    pad : bool, optional
+        Option whether to zero pad the last block to the full blocksize.
+    dtype : dtype, optional
+        Sample type, e.g. float32, float64 or an integer type for raw PCM values.
+        Defaults to float64 for PCM and to the stored type for IEEE float files.
+
+    Yields
+    ------
+    data : ndarray
+        Block content of the .wav file.
+    time : float
+        Block start time in seconds.
+    """
+
+    assert isinstance(blocksize, int) and blocksize > 0
+    assert isinstance(overlap, int) and 0 <= overlap < blocksize
+
+    path = wavpath(path)
+
+    with builtins.open(path, 'rb') as file:
+
+        header = parse(file)
+
+        sr = header.sr
+        bytes = header.bits // 8
+        channels = header.channels
+        n = header.length
+
+        dasp.log.echo(f'Streaming data from file {path} {dict(sr=sr, bytes=bytes, channels=channels, n=n, blocksize=blocksize, overlap=overlap)}')
+
+        for i in range(0, n, blocksize - overlap):
+
+            data = bytearray((min(i + blocksize, n) - i) * bytes * channels)
+
+            file.seek(header.offset + i * bytes * channels)
+            file.readinto(data)
+
+            block = decode(data, header.bits, channels, header.tag, dtype)
+
+            if pad and len(block) < blocksize:
+                block = numpy.pad(block, ((0, blocksize - len(block)), (0, 0)))
+
+            block = block.ravel() if channels == 1 else block
+
+            yield block, i * (1 / sr)
+
+            if i + blocksize >= n:
+                break
+
+
+def write(path, data, sr=None, bits=None, ieee=False, extensible=False):
     """
     Writes a .wav file.
 
@@ -153,56 +1023,353 @@ def write(path, data, sr=None, bits=24):
     path : string
         File path with or without the .wav extension.
     data : ndarray
-        Content of the .wav file.
+        Content of the .wav file, either float samples
+        or signed PCM sample values in the full range of the integer type.
     sr : integer, optional
         Sample rate in hertz.
     bits : integer, optional
-        Sample bitwidth.
+        Sample bitwidth, defaults to 32 bit for IEEE floating point,
+        the integer type size or 24 bit otherwise.
+    ieee : bool, optional
+        Option whether to write IEEE floating point (32 or 64 bit) instead of integer PCM samples.
+    extensible : bool, optional
+        Option whether to write the extensible format header.
     """
 
-    sr = sr if sr is not None else dasp.SR
+    data = numpy.asarray(data)
+    assert data.dtype.kind in 'fci'
+    assert data.ndim in [1, 2]
+    assert data.size > 0
 
-    if path.startswith('~'):
-        path = os.path.expanduser(path)
+    if bits is None:
+        bits = 32 if ieee else min(data.dtype.itemsize * 8, 32) if data.dtype.kind == 'i' else 24
 
-    if not path.lower().endswith('.wav'):
-        path += '.wav'
+    data = frames(data)
+
+    with Writer(path, sr=sr, bits=bits, channels=data.shape[1], ieee=ieee, extensible=extensible) as file:
+        file.write(data)
+
+
+def frames(data, channels=None):
+    """
+    Returns a (samples,channels) view of the specified sample array.
+
+    Complex 1D arrays are treated as stereo (real,imag) frames.
+    Without the expected number of channels, 2D arrays of shape
+    (2,samples) are treated as stereo and (samples,channels) otherwise.
+
+    Parameters
+    ----------
+    data : ndarray
+        Sample array of shape (samples,), (samples,channels) or (channels,samples).
+    channels : integer, optional
+        Expected number of channels.
+
+    Returns
+    -------
+    data : ndarray
+        Sample array of shape (samples,channels).
+    """
 
     data = numpy.asarray(data)
-    assert data.dtype in [float, complex]
     assert data.ndim in [1, 2]
-    assert data.size > 0
 
-    if numpy.iscomplex(data).any():
-        assert data.ndim == 1
-        data = numpy.stack((numpy.real(data), numpy.imag(data)))
+    if numpy.iscomplexobj(data):
+        if channels == 2 or numpy.iscomplex(data).any():
+            assert data.ndim == 1
+            data = numpy.ascontiguousarray(data).view(data.real.dtype).reshape(-1, 2)  # (real,imag) frames
+        else:
+            data = data.real
+
+    if data.ndim == 1:
+        return data[:, None]
+
+    if channels is None:
+        return data.T if data.shape[0] == 2 else data
+
+    return data if data.shape[1] == channels else data.T
+
+
+class Writer:
+    """
+    Writes a .wav file incrementally, block by block.
+
+    The RIFF sizes are patched on close. If the file exceeds 4 GiB,
+    the RF64 format is written instead of the plain RIFF format.
+    Use it as a context manager::
+
+        with dasp.io.Writer(path, sr) as file:
+            for block in blocks:
+                file.write(block)
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+    sr : integer, optional
+        Sample rate in hertz.
+    bits : integer, optional
+        Sample bitwidth, defaults to 32 bit for IEEE floating point or 24 bit otherwise.
+    channels : integer, optional
+        Number of interleaved channels.
+    ieee : bool, optional
+        Option whether to write IEEE floating point (32 or 64 bit) instead of integer PCM samples.
+    extensible : bool, optional
+        Option whether to write the extensible format header.
+    rf64 : bool, optional
+        Option whether to write the RF64 format always (true), never (false)
+        or only if the file exceeds 4 GiB (none).
+    """
+
+    limit = 0xFFFFFFFF
+    """Maximum RIFF chunk size of the plain RIFF format."""
+
+    block = 2**16
+    """Number of samples to encode at once."""
+
+    def __init__(self, path, sr=None, bits=None, channels=1, ieee=False, extensible=False, rf64=None):
+
+        sr = sr if sr is not None else dasp.SR
+        bits = bits if bits is not None else 32 if ieee else 24
+
+        path = wavpath(path)
+
+        assert bits in ([32, 64] if ieee else [8, 16, 24, 32])
+        assert isinstance(channels, int) and channels > 0
+        assert rf64 in [True, False, None]
 
-    if data.ndim == 2:
-        if data.shape[0] == 2:
-            channels = data.shape[0]
-            data = data.ravel('F')
+        self.path = path
+        self.tag = FLOAT if ieee else PCM
+        self.extensible = extensible
+        self.sr = sr
+        self.bits = bits
+        self.channels = channels
+        self.rf64 = rf64
+        self.size = 0
+
+        dasp.log.echo(f'Writing data to file {path} {dict(sr=sr, bytes=bits // 8, channels=channels)}')
+
+        self.file = builtins.open(path, 'wb')
+        self.file.write(self.header())
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *args):
+
+        self.close()
+
+    def header(self, rf64=False):
+        """
+        Returns the RIFF or RF64 header according to the current data size.
+
+        The plain RIFF header reserves a JUNK chunk of the ds64 chunk size,
+        so that it can be turned into an RF64 header in place.
+        """
+
+        blockalign = self.channels * self.bits // 8
+        samples = self.size // blockalign
+
+        fmt = struct.pack('<HHIIHH', EXTENSIBLE if self.extensible else self.tag,
+                          self.channels, self.sr, self.sr * blockalign, blockalign, self.bits)
+
+        if self.extensible:
+            fmt += struct.pack('<HHI16s', 22, self.bits, 0, struct.pack('<I', self.tag) + GUID)
+        elif self.tag != PCM:
+            fmt += struct.pack('<H', 0)
+
+        chunks = [(b'fmt ', fmt)]
+
+        if self.tag != PCM:
+            chunks += [(b'fact', struct.pack('<I', min(samples, 0xFFFFFFFF)))]
+
+        chunks = b''.join(struct.pack('<4sI', id, len(chunk)) + chunk for id, chunk in chunks)
+
+        riffsize = 4 + (8 + 28) + len(chunks) + 8 + self.size + self.size % 2
+
+        if rf64:
+            ds64 = struct.pack('<QQQI', riffsize, self.size, samples, 0)
+            return struct.pack('<4sI4s4sI28s', b'RF64', 0xFFFFFFFF, b'WAVE', b'ds64', len(ds64), ds64) + \
+                   chunks + struct.pack('<4sI', b'data', 0xFFFFFFFF)
         else:
-            channels = data.shape[1]
-            data = data.ravel('C')
-    else:
-        channels = 1
+            return struct.pack('<4sI4s4sI28s', b'RIFF', riffsize, b'WAVE', b'JUNK', 28, b'\0' * 28) + \
+                   chunks + struct.pack('<4sI', b'data', self.size)
 
-    assert bits in [8, 16, 24, 32]
-    bytes = bits // 8
-    scaler = 2 ** (bits - 1) - 1
+    def write(self, data):
+        """
+        Appends the specified samples.
+
+        Parameters
+        ----------
+        data : ndarray
+            Sample array of shape (samples,) or (samples,channels).
+        """
+
+        assert self.file is not None, 'File is already closed!'
+
+        data = numpy.asarray(data)
+        assert data.dtype.kind in 'fci'
+
+        data = frames(data, self.channels)
+        assert data.shape[1] == self.channels, f'Expected {self.channels} channels, got {data.shape}!'
+
+        size = data.size * (self.bits // 8)
+
+        if self.rf64 is False and len(self.header()) - 8 + self.size + size > self.limit:
+            raise Exception(f'File {self.path} exceeds the RIFF size limit!')
+
+        for i in range(0, len(data), self.block):
+            self.file.write(encode(data[i:i + self.block], self.bits, self.tag))
+
+        self.size += size
+
+    def close(self):
+        """
+        Patches the header and closes the file.
+        """
+
+        if self.file is None:
+            return
+
+        if self.size % 2:
+            self.file.write(b'\0')  # RIFF pad byte
+
+        rf64 = self.rf64 if self.rf64 is not None else \
+               self.file.tell() - 8 > self.limit
 
-    data = data.clip(-1, +1)
-    data = (data * (scaler + 0.5)) - 0.5
-    data += 128 if bits == 8 else 0  # to unsigned 8bit
+        self.file.seek(0)
+        self.file.write(self.header(rf64=rf64))
+        self.file.close()
+        self.file = None
 
-    data = b''.join([
-        int(frame).to_bytes(length=bytes, signed=(bits != 8), byteorder=sys.byteorder)
-        for frame in data])
 
-    dasp.log.echo(f'Writing data to file {path} {dict(sr=sr, bytes=bytes, channels=channels, n=len(data))}')
+async def read_async(path, start=None, stop=None, dtype=None, chunksize=2**20, executor=None):
+    """
+    Reads a .wav file without blocking the event loop.
+
+    The file is read chunk by chunk and decoded in the executor.
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+    start : integer, float, optional
+        First sample index (integer) or time in seconds (float) to read.
+    stop : integer, float, optional
+        Sample index (integer) or time in seconds (float) to stop reading at.
+    dtype : dtype, optional
+        Sample type, e.g. float32, float64 or an integer type for raw PCM values.
+    chunksize : integer, optional
+        Number of bytes to read at once.
+    executor : Executor, optional
+        Executor to run the blocking calls in, defaults to the event loop executor.
+
+    Returns
+    -------
+    data : ndarray
+        Content of the .wav file.
+    time : ndarray
+        Corresponding timeline array.
+    sr : integer
+        Sample rate in hertz.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    path = wavpath(path)
+
+    file = await loop.run_in_executor(executor, builtins.open, path, 'rb')
+
+    try:
+
+        header = await loop.run_in_executor(executor, parse, file)
+        start, stop, offset, size = locate(header, start, stop)
+
+        data = bytearray(size)
+        view = memoryview(data)
+
+        await loop.run_in_executor(executor, file.seek, offset)
+
+        for i in range(0, len(data), chunksize):
+            await loop.run_in_executor(executor, file.readinto, view[i:i + chunksize])
+
+    finally:
+
+        file.close()
+
+    dasp.log.echo(f'Reading data from file {path} {dict(sr=header.sr, bytes=header.bits // 8, channels=header.channels, n=len(data))}')
+
+    return await loop.run_in_executor(executor, unpack, data, header, start, stop, dtype)
+
+
+async def read_many_async(paths, concurrency=16, **kwargs):
+    """
+    Reads multiple .wav files concurrently without blocking the event loop.
+
+    Failed files do not abort the batch, but are reported separately.
+
+    Parameters
+    ----------
+    paths : string, list
+        List of file paths or a glob pattern like "~/clips/**/*.wav".
+    concurrency : integer, optional
+        Maximum number of files to read at the same time.
+    kwargs : optional
+        Further `read_async` arguments, e.g. start, stop or dtype.
+
+    Returns
+    -------
+    results : list
+        Ordered list of `read_async` results with None for failed files.
+    errors : dict
+        Exception per failed file path.
+    """
+
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(os.path.expanduser(paths), recursive=True))
+
+    paths = list(paths)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def task(path):
+        async with semaphore:
+            return await read_async(path, **kwargs)
+
+    results = await asyncio.gather(*[task(path) for path in paths], return_exceptions=True)
+
+    errors = {path: error for path, error in zip(paths, results) if isinstance(error, BaseException)}
+    results = [None if isinstance(result, BaseException) else result for result in results]
+
+    return results, errors
+
+
+async def write_async(path, data, sr=None, bits=None, ieee=False, extensible=False, executor=None):
+    """
+    Writes a .wav file without blocking the event loop.
+
+    The samples are encoded and written in the executor.
+
+    Parameters
+    ----------
+    path : string
+        File path with or without the .wav extension.
+    data : ndarray
+        Content of the .wav file.
+    sr : integer, optional
+        Sample rate in hertz.
+    bits : integer, optional
+        Sample bitwidth, defaults to 32 bit for IEEE floating point,
+        the integer type size or 24 bit otherwise.
+    ieee : bool, optional
+        Option whether to write IEEE floating point (32 or 64 bit) instead of integer PCM samples.
+    extensible : bool, optional
+        Option whether to write the extensible format header.
+    executor : Executor, optional
+        Executor to run the blocking calls in, defaults to the event loop executor.
+    """
+
+    loop = asyncio.get_running_loop()
 
-    with wave.open(path, 'wb') as file:
-        file.setframerate(sr)
-        file.setsampwidth(bytes)
-        file.setnchannels(channels)
-        file.writeframes(data)
+    await loop.run_in_executor(executor, functools.partial(
+        write, path, data, sr=sr, bits=bits, ieee=ieee, extensible=extensible))
@@ -321,9 +321,9 @@ class fft:
         Parameters
         ----------
         x : array
-            Timeline array.
-        y : array
-            Signal amplitude array.
+            Timeline array, unless y is a Spectrum.
+        y : array, Spectrum
+            Signal amplitude array or precomputed `dasp.fft.Spectrum`.
         xlim : float, tuple, optional
             Frequency limits in Hz.
         ylim : float, tuple, optional
@@ -344,25 +344,33 @@ class fft:
                 else:
                     plotpy.ylim(ylim, 0)
 
-        assert x is not None
+        def dft(v):
+
+            if isinstance(v, dasp.fft.Spectrum):
+                return v.freqs, v.db
+
+            assert x is not None
+
+            return dasp.fft.abs(x, v, **kwargs)
+
         assert y is not None
 
         if isinstance(y, dict):
             for i, (k, v) in enumerate(y.items()):
                 plotpy.gcf().add_subplot(len(y), 1, i + 1, title=k)
-                f, a = dasp.fft.abs(x, v, **kwargs)
+                f, a = dft(v)
                 plotpy.plot(f, a)
                 plotpy.ylabel('dB')
                 lim()
         elif isinstance(y, (list, tuple)):
             for i, v in enumerate(y):
                 plotpy.gcf().add_subplot(len(y), 1, i + 1)
-                f, a = dasp.fft.abs(x, v, **kwargs)
+                f, a = dft(v)
                 plotpy.plot(f, a)
                 plotpy.ylabel('dB')
                 lim()
         else:
-            f, a = dasp.fft.abs(x, y, **kwargs)
+            f, a = dft(y)
             plotpy.plot(f, a)
             plotpy.ylabel('dB')
             lim()
@@ -378,9 +386,9 @@ class fft:
         Parameters
         ----------
         x : array
-            Timeline array.
-        y : array
-            Signal amplitude array.
+            Timeline array, unless y is a Spectrum.
+        y : array, Spectrum
+            Signal amplitude array or precomputed `dasp.fft.Spectrum`.
         xlim : float, tuple, optional
             Frequency limits in Hz.
         ylim : float, tuple, optional
@@ -401,25 +409,33 @@ class fft:
                 else:
                     plotpy.ylim(+ylim, -ylim)
 
-        assert x is not None
+        def dft(v):
+
+            if isinstance(v, dasp.fft.Spectrum):
+                return v.freqs, v.phase(kwargs.get('wrap'))
+
+            assert x is not None
+
+            return dasp.fft.arg(x, v, **kwargs)
+
         assert y is not None
 
         if isinstance(y, dict):
             for i, (k, v) in enumerate(y.items()):
                 plotpy.gcf().add_subplot(len(y), 1, i + 1, title=k)
-                f, a = dasp.fft.arg(x, v, **kwargs)
+                f, a = dft(v)
                 plotpy.plot(f, a)
                 plotpy.ylabel('rad')
                 lim()
         elif isinstance(y, (list, tuple)):
             for i, v in enumerate(y):
                 plotpy.gcf().add_subplot(len(y), 1, i + 1)
-                f, a = dasp.fft.arg(x, v, **kwargs)
+                f, a = dft(v)
                 plotpy.plot(f, a)
                 plotpy.ylabel('rad')
                 lim()
         else:
-            f, a = dasp.fft.arg(x, y, **kwargs)
+            f, a = dft(y)
             plotpy.plot(f, a)
             plotpy.ylabel('rad')
             lim()
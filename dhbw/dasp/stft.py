@@ -1,47 +1,140 @@
+import concurrent.futures
 import numpy
+import os
 
 from numpy.lib.stride_tricks import sliding_window_view
 
+from dhbw import dasp
 
-def stft(samples, framesize, hopsize):
+
+def precision(dtype=None):
+    """
+    Returns the real and complex data type of the same precision as the specified one.
+
+    Parameters
+    ----------
+    dtype : dtype, optional
+        Real or complex data type, defaults to double precision.
+    """
+
+    real = numpy.finfo(dtype if dtype is not None else float).dtype
+
+    return real, numpy.result_type(real, numpy.complex64)
+
+
+def stft(samples, framesize, hopsize, axis=0, chunksize=None, dtype=None, workers=None, out=None, backend=None):
     """
     Estimate the DFT matrix for the given sample array.
 
+    Multi-dimensional sample arrays, e.g. multiple channels of shape
+    (samples,channels) or multiple clips of shape (clips,samples),
+    are transformed along the specified axis all at once.
+
+    Since the frames are read and transformed chunk by chunk, the sample array
+    can also be memory-mapped, e.g. via `numpy.load(path, mmap_mode='r')`.
+    Together with a memory-mapped output array, the working set is bounded
+    by the chunk size regardless of the signal duration.
+
     Parameters
     ----------
     samples : ndarray, list, float
         Array of samples.
+    axis : int, optional
+        Sample axis, which is replaced by the frame and frequency axes.
+    chunksize : int, optional
+        Number of frames to transform at once, which bounds the temporary memory.
+    dtype : dtype, optional
+        Precision of frames, window and output, either single (float32, complex64)
+        or double (float64, complex128), which is the default.
+    workers : int, optional
+        Number of threads to transform the chunks of frames concurrently,
+        which yields exactly the same DFT matrix as the serial transform.
+    out : ndarray or string, optional
+        Preallocated output array of the DFT matrix shape and complex dtype,
+        e.g. a `numpy.memmap`, or a .npy file path to create a memory-mapped one.
+    backend : str, optional
+        FFT backend name, see `dasp.fft.backend`.
 
     Returns
     -------
     dfts : ndarray
-        DFT matrix of shape (samples,frequencies).
+        DFT matrix of shape (samples,frequencies),
+        or (...,samples,frequencies,...) in case of multi-dimensional input.
     """
 
     samples = numpy.atleast_1d(samples)
+    axis = axis % samples.ndim
+
+    # move the sample axis to the end, so that each frame is contiguous
+    samples = numpy.moveaxis(samples, axis, -1)
+
+    real, imag = precision(dtype)
+
+    frames = sliding_window_view(samples, framesize, axis=-1, writeable=False)[..., ::hopsize, :]
+    shape = frames.shape[:-2] + (frames.shape[-2], len(numpy.fft.rfftfreq(framesize)))
+
+    if out is None:
+
+        dfts = numpy.zeros(shape, imag)
 
-    assert samples.ndim == 1, f'Expected 1D array (samples,), got {samples.shape}!'
+    else:
 
-    frames = sliding_window_view(samples, framesize, writeable=False)[::hopsize]
-    dfts = numpy.zeros((len(frames), len(numpy.fft.rfftfreq(framesize))), complex)
+        # the frame and frequency axes replace the sample axis
+        expected = shape[:-2][:axis] + shape[-2:] + shape[:-2][axis:]
 
-    w = 0.5 - 0.5 * numpy.cos(2 * numpy.pi * numpy.arange(framesize) / framesize)
+        if isinstance(out, str):
+            out = numpy.lib.format.open_memmap(os.path.expanduser(out), mode='w+', dtype=imag, shape=expected)
 
-    for i, frame in enumerate(frames):
+        assert out.shape == expected, f'Expected output shape {expected}, got {out.shape}!'
+        assert out.dtype == imag, f'Expected output dtype {imag}, got {out.dtype}!'
 
-        dfts[i] = numpy.fft.rfft(w * frame, norm='forward')
+        dfts = numpy.moveaxis(out, (axis, axis + 1), (-2, -1))
 
-    return dfts
+    chunksize = chunksize or max(1, 2**16 // (framesize * int(numpy.prod(frames.shape[:-2]))))
 
+    w = dasp.fft.window('hann', framesize, symmetric=False, dtype=real)
 
-def istft(dfts, framesize, hopsize):
+    def transform(i):
+        dfts[..., i:i + chunksize, :] = dasp.fft.backend.rfft(w * frames[..., i:i + chunksize, :].astype(real, copy=False), norm='forward', name=backend)
+
+    chunks = range(0, frames.shape[-2], chunksize)
+
+    if workers is not None and workers > 1:
+        # the FFT releases the GIL, so the disjoint chunks can be transformed in threads
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            list(executor.map(transform, chunks))
+    else:
+        for i in chunks:
+            transform(i)
+
+    if out is not None:
+
+        if isinstance(out, numpy.memmap):
+            out.flush()
+
+        return out
+
+    return numpy.moveaxis(dfts, (-2, -1), (axis, axis + 1))
+
+
+def istft(dfts, framesize, hopsize, axis=0, chunksize=None, dtype=None, backend=None):
     """
     Synthesize the sample array from the given DFT matrix.
 
     Parameters
     ----------
     dfts : ndarray
-        DFT matrix of shape (samples,frequencies).
+        DFT matrix of shape (samples,frequencies),
+        or (...,samples,frequencies,...) in case of multi-dimensional output.
+    axis : int, optional
+        Sample axis of the output, i.e. the frame axis followed by the frequency axis.
+    chunksize : int, optional
+        Number of frames to transform at once, which bounds the temporary memory.
+    dtype : dtype, optional
+        Precision of frames, window and output, either single (float32, complex64)
+        or double (float64, complex128), which is the default.
+    backend : str, optional
+        FFT backend name, see `dasp.fft.backend`.
 
     Returns
     -------
@@ -50,17 +143,360 @@ def istft(dfts, framesize, hopsize):
     """
 
     dfts = numpy.atleast_2d(dfts)
+    axis = axis % (dfts.ndim - 1)
+
+    dfts = numpy.moveaxis(dfts, (axis, axis + 1), (-2, -1))
+
+    # each frame spans m hops, the last one possibly partially
+    m = -(-framesize // hopsize)
+    n = dfts.shape[-2] * hopsize + framesize
+
+    samples = numpy.zeros(dfts.shape[:-2] + ((dfts.shape[-2] + m) * hopsize,), precision(dtype)[0])
+
+    overlapadd(dfts, framesize, hopsize, samples, chunksize, backend)
+
+    if samples.ndim == 1:
+        samples.resize(n)  # shrink in place
+        return samples
+
+    return numpy.moveaxis(samples[..., :n], -1, axis)
+
+
+def overlapadd(dfts, framesize, hopsize, samples, chunksize=None, backend=None):
+    """
+    Overlap-add the windowed IDFT frames of the given DFT matrix
+    to the sample array in place, the i-th frame at the i-th hop.
+
+    Parameters
+    ----------
+    dfts : ndarray
+        DFT matrix of shape (...,samples,frequencies).
+    samples : ndarray
+        Contiguous array of shape (...,(samples + ceil(framesize / hopsize)) * hopsize),
+        which also determines the computation precision.
+    chunksize : int, optional
+        Number of frames to transform at once, which bounds the temporary memory.
+    backend : str, optional
+        FFT backend name, see `dasp.fft.backend`.
+    """
+
+    # each frame spans m hops, the last one possibly partially
+    m = -(-framesize // hopsize)
+
+    assert samples.flags.c_contiguous
+    assert samples.shape == dfts.shape[:-2] + ((dfts.shape[-2] + m) * hopsize,)
+
+    chunksize = chunksize or max(1, 2**16 // (framesize * int(numpy.prod(dfts.shape[:-2]))))
+
+    hops = samples.reshape(samples.shape[:-1] + (-1, hopsize))
+
+    real, imag = precision(samples.dtype)
+
+    w = dasp.fft.window('hann', framesize, symmetric=False, dtype=real)
+    w = w * (hopsize / numpy.sum(w**2))  # unity gain
+
+    for i in range(0, dfts.shape[-2], chunksize):
+
+        frames = w * dasp.fft.backend.irfft(dfts[..., i:i + chunksize, :].astype(imag, copy=False), framesize, norm='forward', name=backend)
+        frames = numpy.pad(frames, [(0, 0)] * (frames.ndim - 1) + [(0, m * hopsize - framesize)])
+        frames = frames.reshape(frames.shape[:-1] + (m, hopsize))
+
+        # overlap-add the j-th hop of all frames at once,
+        # in reverse order to accumulate earlier frames first
+        for j in reversed(range(m)):
+            hops[..., i + j:i + j + frames.shape[-3], :] += frames[..., j, :]
+
+
+class Analyzer:
+    """
+    Streaming STFT analyzer for arbitrary sized sample blocks.
+
+    Each `push` returns only the newly completed frames, which are identical to
+    the corresponding `stft` frames of the whole signal. Since a frame is
+    completed every hopsize samples, the latency is one hop.
+
+    Parameters
+    ----------
+    framesize : int
+        Number of samples per frame.
+    hopsize : int
+        Number of samples between consecutive frames.
+    chunksize : int, optional
+        Number of frames to transform at once.
+    dtype : dtype, optional
+        Precision of frames, window and output.
+    """
+
+    def __init__(self, framesize, hopsize, chunksize=None, dtype=None):
+
+        self.framesize = framesize
+        self.hopsize = hopsize
+        self.chunksize = chunksize
+        self.dtype = dtype
+
+        self.buffer = numpy.zeros(0, precision(dtype)[0])
+        self.skip = 0
+
+    def push(self, samples):
+        """
+        Appends the specified samples and returns the newly completed frames.
+
+        Parameters
+        ----------
+        samples : ndarray, list, float
+            Array of samples.
+
+        Returns
+        -------
+        dfts : ndarray
+            DFT matrix of shape (samples,frequencies).
+        """
+
+        samples = numpy.atleast_1d(samples)
+
+        assert samples.ndim == 1, f'Expected 1D array (samples,), got {samples.shape}!'
+
+        # drop samples between frames, if the hopsize exceeds the framesize
+        skip = min(self.skip, len(samples))
+        samples = samples[skip:]
+        self.skip -= skip
+
+        buffer = numpy.concatenate((self.buffer, samples.astype(self.buffer.dtype, copy=False)))
+
+        if len(buffer) < self.framesize:
+            self.buffer = buffer
+            return numpy.zeros((0, len(numpy.fft.rfftfreq(self.framesize))), precision(self.dtype)[1])
+
+        dfts = stft(buffer, self.framesize, self.hopsize, chunksize=self.chunksize, dtype=self.dtype)
+
+        # keep the remaining samples starting at the next frame
+        offset = len(dfts) * self.hopsize
+        self.buffer = buffer[offset:].copy()
+        self.skip = max(0, offset - len(buffer))
+
+        return dfts
+
+
+class Synthesizer:
+    """
+    Streaming ISTFT synthesizer for arbitrary numbers of frames.
+
+    Each `push` returns only the finished samples, which are identical to the
+    corresponding `istft` samples of the whole DFT matrix. The samples of the
+    last frame are pending until the next frames arrive or `flush` is called.
+
+    Parameters
+    ----------
+    framesize : int
+        Number of samples per frame.
+    hopsize : int
+        Number of samples between consecutive frames.
+    chunksize : int, optional
+        Number of frames to transform at once.
+    dtype : dtype, optional
+        Precision of frames, window and output.
+    """
+
+    def __init__(self, framesize, hopsize, chunksize=None, dtype=None):
+
+        self.framesize = framesize
+        self.hopsize = hopsize
+        self.chunksize = chunksize
+
+        self.buffer = numpy.zeros(framesize, precision(dtype)[0])
+
+    def push(self, dfts):
+        """
+        Appends the specified frames and returns the finished samples.
+
+        Parameters
+        ----------
+        dfts : ndarray
+            DFT matrix of shape (samples,frequencies) or a single DFT frame.
+
+        Returns
+        -------
+        samples : ndarray
+            Array of hopsize samples per frame.
+        """
+
+        dfts = numpy.atleast_2d(dfts)
+
+        assert dfts.ndim == 2, f'Expected 2D array (samples,frequencies), got {dfts.shape}!'
+
+        # each frame spans m hops, the last one possibly partially
+        m = -(-self.framesize // self.hopsize)
+
+        samples = numpy.zeros(((len(dfts) + m) * self.hopsize), self.buffer.dtype)
+        samples[:self.framesize] = self.buffer
+
+        overlapadd(dfts, self.framesize, self.hopsize, samples, self.chunksize)
+
+        offset = len(dfts) * self.hopsize
+        self.buffer = samples[offset:offset + self.framesize].copy()
+
+        return samples[:offset]
+
+    def flush(self):
+        """
+        Returns the pending samples and resets the state.
+
+        Returns
+        -------
+        samples : ndarray
+            Array of framesize samples.
+        """
+
+        samples = self.buffer
+        self.buffer = numpy.zeros(self.framesize, samples.dtype)
+
+        return samples
+
+
+class Welch:
+    """
+    Averaged power spectral density estimate of arbitrary sized sample blocks,
+    in the sense of Welch's method with a periodic Hann window.
+
+    Only the running sum of the squared DFT magnitudes and the number of
+    frames are kept, so the memory is constant regardless of the signal
+    duration. The frames are identical to the corresponding `stft` frames
+    of the whole signal, see `Analyzer`.
+
+    Like the `Analyzer`, it accepts mono blocks only. For multi-channel blocks,
+    e.g. of `dasp.io.stream`, push each channel `block[:, i]` into its own instance.
+
+    Partial estimates of consecutive signal parts, e.g. computed by parallel
+    workers, can be combined via `merge`. Since each estimate also keeps its
+    first and last samples, the frames spanning the part boundaries are
+    completed on merge, so that the combined estimate equals the one of the
+    whole signal, as long as each part except the last one is a multiple
+    of the hopsize long.
+
+    Parameters
+    ----------
+    framesize : int
+        Number of samples per frame.
+    hopsize : int
+        Number of samples between consecutive frames.
+    sr : int, optional
+        Sample rate in hertz.
+    dtype : dtype, optional
+        Precision of frames and window.
+    """
+
+    def __init__(self, framesize, hopsize, sr=None, dtype=None):
+
+        self.framesize = framesize
+        self.hopsize = hopsize
+        self.sr = sr if sr is not None else dasp.SR
+
+        self.analyzer = Analyzer(framesize, hopsize, dtype=dtype)
+
+        # the first framesize - hopsize samples complete
+        # the frames spanning the boundary to a preceding part on merge
+        self.head = numpy.zeros(0, self.analyzer.buffer.dtype)
+        self.length = 0
+
+        self.power = numpy.zeros(len(numpy.fft.rfftfreq(framesize)), float)
+        self.count = 0
+
+    def push(self, samples):
+        """
+        Accumulates the frames completed by the specified samples.
+
+        Parameters
+        ----------
+        samples : ndarray, list, float
+            Array of samples.
+
+        Returns
+        -------
+        self : Welch
+            This instance to allow method chaining.
+        """
+
+        samples = numpy.atleast_1d(samples)
+
+        assert samples.ndim == 1, f'Expected 1D array (samples,), got {samples.shape}, use one instance per channel!'
+
+        headsize = max(0, self.framesize - self.hopsize)
+
+        if len(self.head) < headsize:
+            head = samples[:headsize - len(self.head)].astype(self.head.dtype, copy=False)
+            self.head = numpy.concatenate((self.head, head))
+
+        dfts = self.analyzer.push(samples)
+
+        self.power += numpy.sum(dfts.real**2 + dfts.imag**2, axis=0, dtype=float)
+        self.count += len(dfts)
+        self.length += len(samples)
+
+        return self
+
+    def merge(self, other):
+        """
+        Accumulates the frames of the specified partial estimate
+        of the signal part immediately following this one.
+
+        Parameters
+        ----------
+        other : Welch
+            Partial estimate of the same frame and hop size.
+
+        Returns
+        -------
+        self : Welch
+            This instance to allow method chaining.
+        """
+
+        assert (self.framesize, self.hopsize, self.sr) == (other.framesize, other.hopsize, other.sr)
+        assert self.length % self.hopsize == 0, f'Expected a multiple of the hopsize {self.hopsize}, got {self.length} samples!'
+
+        # complete the frames spanning the boundary between both parts
+        self.push(other.head)
+
+        if other.length > len(other.head):
+
+            # continue with the remaining samples of the other part
+            self.analyzer.buffer = other.analyzer.buffer
+            self.analyzer.skip = other.analyzer.skip
+
+            self.power += other.power
+            self.count += other.count
+            self.length += other.length - len(other.head)
+
+        return self
+
+    def psd(self, db=False):
+        """
+        Returns the one-sided power spectral density of all frames so far.
+
+        Parameters
+        ----------
+        db : bool, optional
+            Option whether to express the output values in decibels.
+
+        Returns
+        -------
+        freqs : ndarray
+            Frequency array in hertz.
+        psd : ndarray
+            Corresponding power spectral density values in 1/Hz.
+        """
 
-    assert dfts.ndim == 2, f'Expected 2D array (samples,frequencies), got {dfts.shape}!'
+        w = dasp.fft.window('hann', self.framesize, symmetric=False)
 
-    samples = numpy.zeros((len(dfts) * hopsize + framesize), float)
-    frames = sliding_window_view(samples, framesize, writeable=True)[::hopsize]
+        # undo the forward DFT normalization and normalize by the window power instead
+        psd = self.power / max(self.count, 1) * self.framesize**2 / (self.sr * numpy.sum(w**2))
 
-    w = 0.5 - 0.5 * numpy.cos(2 * numpy.pi * numpy.arange(framesize) / framesize)
-    w *= hopsize / numpy.sum(w**2)  # unity gain
+        # fold the negative frequencies except for DC and Nyquist
+        psd[1:(self.framesize + 1) // 2] *= 2
 
-    for i, dft in enumerate(dfts):
+        freqs = numpy.fft.rfftfreq(self.framesize, 1 / self.sr)
 
-        frames[i] += w * numpy.fft.irfft(dft, norm='forward')
+        if db:
+            with numpy.errstate(divide='ignore'):
+                psd = 10 * numpy.log10(psd)  # power rather than amplitude
 
-    return samples
+        return freqs, psd
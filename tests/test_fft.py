@@ -18,6 +18,123 @@ class FftTest(unittest.TestCase):
 
         self.assertTrue(np.allclose(x, y))
 
+    def test_axis(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)[:100 * 441].reshape(100, 441)
+
+        z = np.stack([dasp.fft.fft(v) for v in x])
+
+        self.assertTrue(np.allclose(z, dasp.fft.fft(x)))
+        self.assertTrue(np.allclose(z.T, dasp.fft.fft(x.T, axis=0)))
+        self.assertTrue(np.allclose(x, dasp.fft.ifft(dasp.fft.fft(x.T, window=None, axis=0), n=441, axis=0).T))
+
+        f, a = dasp.fft.abs(dasp.SR, x)
+        self.assertEqual(f.shape, (441 // 2 + 1,))
+        self.assertEqual(a.shape, (100, 441 // 2 + 1))
+        self.assertTrue(np.allclose(a, dasp.math.abs(z)))
+
+        f, a = dasp.fft.arg(dasp.SR, x, wrap=False)
+        self.assertEqual(a.shape, (100, 441 // 2 + 1))
+        self.assertTrue(np.allclose(a, dasp.math.arg(z, wrap=False)))
+
+    def test_pad(self):
+
+        x = dasp.signal.noise(dasp.timeline(1))[:10007]  # prime
+
+        self.assertEqual(dasp.fft.size(len(x)), 10007)
+        self.assertEqual(dasp.fft.size(len(x), 'fast'), 10125)
+        self.assertEqual(dasp.fft.size(len(x), 'pot'), 16384)
+
+        for pad in ['fast', 'pot']:
+
+            n = dasp.fft.size(len(x), pad)
+
+            z = dasp.fft.fft(x, window=None, pad=pad)
+            y = dasp.fft.ifft(z, n=n)
+
+            self.assertEqual(len(z), n // 2 + 1)
+            self.assertTrue(np.allclose(x, y[:len(x)]))
+            self.assertTrue(np.allclose(y[len(x):], 0))
+
+            f, a = dasp.fft.abs(dasp.SR, x, pad=pad)
+            self.assertEqual(len(f), len(a))
+            self.assertEqual(f[1], dasp.SR / n)
+
+            f, a = dasp.fft.arg(dasp.SR, x, pad=pad)
+            self.assertEqual(len(f), len(a))
+
+        with self.assertRaises(Exception):
+            dasp.fft.size(len(x), 'none')
+
+    def test_spectrum(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.harmonic(1000, t)
+
+        s = dasp.fft.Spectrum(t, x)
+
+        self.assertEqual(s.sr, dasp.SR)
+        self.assertIs(s.dft, s.dft)
+        self.assertEqual(s.freqs[np.argmax(s.abs)], 1000)
+        self.assertTrue(np.allclose(s.db, dasp.math.db(s.abs)))
+        self.assertTrue(np.allclose(s.abs, np.abs(dasp.fft.fft(x))))
+
+        f, a = dasp.fft.abs(t, x)
+        self.assertTrue(np.array_equal(f, s.freqs))
+        self.assertTrue(np.array_equal(a, s.db))
+
+        for wrap in [None, True, False]:
+            f, a = dasp.fft.arg(t, x, wrap=wrap)
+            self.assertTrue(np.array_equal(a, s.phase(wrap)))
+
+    def test_window(self):
+
+        dasp.fft.window.cache_clear()
+
+        w = dasp.fft.window('hann', 1024)
+        v = dasp.fft.window('hann', 1024)
+
+        self.assertIs(w, v)
+        self.assertFalse(w.flags.writeable)
+        self.assertEqual(dasp.fft.window.cache_info().hits, 1)
+        self.assertEqual(dasp.fft.window.cache_info().misses, 1)
+
+        w = dasp.fft.window('hann', 1024, symmetric=False, dtype=np.float32)
+        self.assertEqual(w.dtype, np.float32)
+        self.assertTrue(np.allclose(w, np.hanning(1025)[:-1]))
+
+        currsize = dasp.fft.window.cache_info().currsize
+
+        w = dasp.fft.window('hann', dasp.fft.WINDOWLIMIT + 1)
+
+        self.assertFalse(w.flags.writeable)
+        self.assertTrue(np.allclose(w, np.hanning(dasp.fft.WINDOWLIMIT + 1)))
+        self.assertEqual(dasp.fft.window.cache_info().currsize, currsize)
+
+    def test_backend(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        z = np.fft.rfft(x * dasp.fft.window('hann', len(x)), norm='forward')
+
+        for backend in dasp.fft.backend.names():
+
+            self.assertTrue(np.allclose(z, dasp.fft.fft(x, backend=backend)))
+            self.assertTrue(np.allclose(x, dasp.fft.ifft(dasp.fft.fft(x, window=None, backend=backend), backend=backend)))
+
+        name = dasp.fft.backend.name
+
+        try:
+            dasp.fft.backend.name = 'scipy'
+            self.assertTrue(np.allclose(z, dasp.fft.fft(x)))
+        finally:
+            dasp.fft.backend.name = name
+
+        with self.assertRaises(Exception):
+            dasp.fft.fft(x, backend='none')
+
 if __name__ == '__main__':
 
     unittest.main()
@@ -2,6 +2,7 @@ import os, sys
 src = os.path.join(os.path.dirname(__file__), '..')
 sys.path.insert(0, src)
 
+import asyncio
 import numpy as np
 import unittest
 
@@ -26,6 +27,276 @@ class IoTest(unittest.TestCase):
         self.assertTrue(np.allclose(t, self.t))
         self.assertTrue(np.allclose(y, self.x, atol=1e-7))
 
+    def test_bits(self):
+
+        for bits in [8, 16, 24, 32]:
+
+            dasp.io.write('/tmp/dasp_bits', self.x, bits=bits)
+            y, t, sr = dasp.io.read('/tmp/dasp_bits')
+
+            self.assertTrue(np.allclose(y, self.x, atol=1 / 2**(bits - 2)))
+
+    def test_stereo(self):
+
+        x = np.stack((self.x, -self.x))
+
+        dasp.io.write('/tmp/dasp_stereo', x, bits=16)
+        y, t, sr = dasp.io.read('/tmp/dasp_stereo')
+        self.assertTrue(np.allclose(y, x.T, atol=1e-4))
+
+        dasp.io.write('/tmp/dasp_stereo', x[0] + 1j * x[1], bits=16)
+        y, t, sr = dasp.io.read('/tmp/dasp_stereo')
+        self.assertTrue(np.allclose(y, x.T, atol=1e-4))
+
+    def test_range(self):
+
+        dasp.io.write('/tmp/dasp_range', self.x)
+        x, t, sr = dasp.io.read('/tmp/dasp_range')
+
+        y, u, sr = dasp.io.read('/tmp/dasp_range', start=0.25, stop=0.5)
+        self.assertTrue(np.array_equal(y, x[sr // 4:sr // 2]))
+        self.assertTrue(np.array_equal(u, t[sr // 4:sr // 2]))
+
+        y, u, sr = dasp.io.read('/tmp/dasp_range', start=100, stop=200)
+        self.assertTrue(np.array_equal(y, x[100:200]))
+        self.assertTrue(np.array_equal(u, t[100:200]))
+
+        data, header = dasp.io.mmap('/tmp/dasp_range')
+        self.assertEqual(header.frames, len(x))
+        self.assertTrue(np.array_equal(dasp.io.decode(data[100:200], header.bits).ravel(), x[100:200]))
+
+    def test_stream(self):
+
+        w = 1024
+        h = w//4
+
+        dasp.io.write('/tmp/dasp_stream', self.x)
+        x, t, sr = dasp.io.read('/tmp/dasp_stream')
+
+        blocks = list(dasp.io.stream('/tmp/dasp_stream', 16 * h + w - h, w - h, pad=True))
+
+        self.assertTrue(np.allclose([u for y, u in blocks], t[::16 * h]))
+        self.assertTrue(all(len(y) == 16 * h + w - h for y, u in blocks))
+
+        y = np.concatenate([dasp.stft.stft(y, w, h) for y, u in blocks])
+        z = dasp.stft.stft(x, w, h)
+
+        self.assertTrue(np.allclose(y[:len(z)], z))
+
+    def test_writer(self):
+
+        x = np.stack((self.x, -self.x), axis=-1)
+
+        for rf64 in [False, True]:
+
+            with dasp.io.Writer('/tmp/dasp_writer', channels=2, rf64=rf64) as file:
+                for i in range(0, len(x), 1000):
+                    file.write(x[i:i + 1000])
+
+            with open('/tmp/dasp_writer.wav', 'rb') as file:
+                self.assertEqual(file.read(4), b'RF64' if rf64 else b'RIFF')
+
+            y, t, sr = dasp.io.read('/tmp/dasp_writer')
+            self.assertTrue(np.allclose(y, x, atol=1e-6))
+
+        with dasp.io.Writer('/tmp/dasp_writer') as file:
+            with self.assertRaises(AssertionError):
+                file.write(np.zeros(10, np.uint8))
+
+    def test_float(self):
+
+        for bits, dtype in [(32, np.float32), (64, np.float64)]:
+
+            dasp.io.write('/tmp/dasp_float', 2 * self.x, bits=bits, ieee=True)
+            y, t, sr = dasp.io.read('/tmp/dasp_float')
+
+            self.assertEqual(y.dtype, dtype)
+            self.assertTrue(np.array_equal(y, (2 * self.x).astype(dtype)))
+
+            data, header = dasp.io.mmap('/tmp/dasp_float')
+            self.assertEqual(header.tag, dasp.io.FLOAT)
+            self.assertTrue(np.array_equal(data.ravel(), y))
+
+        dasp.io.write('/tmp/dasp_float', self.x, ieee=True)
+        self.assertEqual(dasp.io.info('/tmp/dasp_float').bits, 32)
+
+        with dasp.io.Writer('/tmp/dasp_float', ieee=True) as file:
+            file.write(self.x)
+
+        y, t, sr = dasp.io.read('/tmp/dasp_float')
+        self.assertEqual(y.dtype, np.float32)
+        self.assertTrue(np.array_equal(y, self.x.astype(np.float32)))
+
+    def test_extensible(self):
+
+        x = np.stack((self.x, -self.x), axis=-1)
+
+        for bits, ieee in [(16, False), (24, False), (32, False), (32, True)]:
+
+            dasp.io.write('/tmp/dasp_extensible', x, bits=bits, ieee=ieee, extensible=True)
+            y, t, sr = dasp.io.read('/tmp/dasp_extensible')
+
+            self.assertTrue(np.allclose(y, x, atol=1e-4))
+
+    def test_dtype(self):
+
+        dasp.io.write('/tmp/dasp_dtype', self.x, bits=16)
+
+        x, t, sr = dasp.io.read('/tmp/dasp_dtype')
+        y, t, sr = dasp.io.read('/tmp/dasp_dtype', dtype=np.float32)
+        z, t, sr = dasp.io.read('/tmp/dasp_dtype', dtype=np.int16)
+
+        self.assertEqual(y.dtype, np.float32)
+        self.assertEqual(z.dtype, np.int16)
+        self.assertTrue(np.allclose(x, y, atol=1e-7))
+
+        u = np.random.default_rng(0).uniform(-1, +1, 2**16).astype(np.float32)
+
+        for bits in [8, 16, 24, 32]:
+            self.assertEqual(dasp.io.encode(u, bits), dasp.io.encode(u.astype(float), bits))
+
+        # float32 samples are encoded the same way as float64 samples
+        dasp.io.write('/tmp/dasp_dtype', y, bits=16)
+        v, t, sr = dasp.io.read('/tmp/dasp_dtype')
+        dasp.io.write('/tmp/dasp_dtype', y.astype(float), bits=16)
+        self.assertTrue(np.array_equal(dasp.io.read('/tmp/dasp_dtype')[0], v))
+        self.assertTrue(np.allclose(v, x, atol=1 / 2**15))
+
+        dasp.io.write('/tmp/dasp_dtype', z, bits=16)
+        self.assertTrue(np.array_equal(dasp.io.read('/tmp/dasp_dtype')[0], x))
+
+        dasp.io.write('/tmp/dasp_dtype', z)
+        self.assertTrue(np.array_equal(dasp.io.read('/tmp/dasp_dtype')[0], x))
+
+        dasp.io.write('/tmp/dasp_dtype', z, bits=24)
+        self.assertTrue(np.allclose(dasp.io.read('/tmp/dasp_dtype')[0], x, atol=1 / 2**14))
+
+        for bits, dtype in [(24, np.int32), (8, np.int16)]:
+
+            dasp.io.write('/tmp/dasp_dtype', 0.9 * self.x, bits=bits)
+            x, t, sr = dasp.io.read('/tmp/dasp_dtype')
+            z, t, sr = dasp.io.read('/tmp/dasp_dtype', dtype=dtype)
+
+            dasp.io.write('/tmp/dasp_dtype', z)
+            self.assertTrue(np.allclose(dasp.io.read('/tmp/dasp_dtype')[0], x, atol=1 / 2**(bits - 2)))
+
+            dasp.io.write('/tmp/dasp_dtype', z, bits=bits)
+            self.assertTrue(np.array_equal(dasp.io.read('/tmp/dasp_dtype')[0], x))
+
+        for bits, dtype in [(24, np.int16), (16, np.int8)]:
+
+            dasp.io.write('/tmp/dasp_dtype', [0.5, -0.5, 0.9], bits=bits)
+
+            z, t, sr = dasp.io.read('/tmp/dasp_dtype', dtype=dtype)
+            s = 2 ** (np.iinfo(dtype).bits - 1)
+
+            self.assertTrue(np.allclose(z, [0.5 * s, -0.5 * s, 0.9 * s], atol=1))
+
+    def test_read_many(self):
+
+        paths = [f'/tmp/dasp_many_{i}' for i in range(4)]
+
+        for i, path in enumerate(paths[:3]):
+            dasp.io.write(path, self.x * (i + 1) / 4)
+
+        results, errors = dasp.io.read_many(paths, workers=2)
+
+        self.assertEqual(list(errors), paths[3:])
+        self.assertIsNone(results[3])
+
+        for i, (y, t, sr) in enumerate(results[:3]):
+            self.assertTrue(np.allclose(y, self.x * (i + 1) / 4, atol=1e-6))
+
+        (y, t, sr), errors = dasp.io.read_many(paths, stack=True)
+        self.assertEqual(y.shape, (3, len(self.x)))
+
+        (y, t, sr), errors = dasp.io.read_many(paths[3:], stack=True)
+        self.assertIsNone(y)
+        self.assertEqual(list(errors), paths[3:])
+
+        results = dict(dasp.io.read_many(paths, ordered=False))
+        self.assertIsInstance(results[paths[3]], Exception)
+
+    def test_cache(self):
+
+        path = dasp.io.cache.path
+        budget = dasp.io.cache.budget
+
+        try:
+
+            dasp.io.cache.path = '/tmp/dasp_cache'
+            dasp.io.cache.clear()
+
+            dasp.io.write('/tmp/dasp_cache_0', self.x)
+            dasp.io.write('/tmp/dasp_cache_1', self.x)
+
+            x, t, sr = dasp.io.read('/tmp/dasp_cache_0', cached=True)
+            y, u, sr = dasp.io.read('/tmp/dasp_cache_0', cached=True)
+
+            self.assertEqual(dasp.io.cache.stats()['hits'], 1)
+            self.assertEqual(dasp.io.cache.stats()['misses'], 1)
+            self.assertTrue(np.array_equal(x, y))
+            self.assertTrue(np.array_equal(t, u))
+
+            y, u, sr = dasp.io.read('/tmp/dasp_cache_0', start=100, stop=200, cached=True)
+            self.assertTrue(np.array_equal(x[100:200], y))
+            self.assertTrue(np.array_equal(t[100:200], u))
+
+            dasp.io.cache.budget = dasp.io.cache.stats()['bytes']
+            dasp.io.read('/tmp/dasp_cache_1', cached=True)
+            self.assertEqual(dasp.io.cache.stats()['entries'], 1)
+
+            dasp.io.read('/tmp/dasp_cache_0', cached=True)
+            self.assertEqual(dasp.io.cache.stats()['misses'], 3)
+
+        finally:
+
+            dasp.io.cache.path = path
+            dasp.io.cache.budget = budget
+
+    def test_index(self):
+
+        path = '/tmp/dasp_index'
+        os.makedirs(path, exist_ok=True)
+
+        dasp.io.write(f'{path}/mono', self.x, sr=48000)
+        dasp.io.write(f'{path}/stereo', np.stack((self.x, self.x)), sr=48000, bits=16)
+
+        header = dasp.io.info(f'{path}/stereo')
+        self.assertEqual((header.sr, header.bits, header.channels), (48000, 16, 2))
+        self.assertEqual(header.frames, len(self.x))
+
+        index = dasp.io.index(path)
+        self.assertEqual(dasp.io.select(index, sr=48000, channels=2), ['stereo.wav'])
+        self.assertEqual(dasp.io.select(index, duration=(0, 0.5)), [])
+
+        dasp.io.write(f'{path}/stereo', np.stack((self.x, self.x)), sr=44100)
+        os.utime(f'{path}/stereo.wav', ns=(0, 0))
+
+        index = dasp.io.index(path, refresh=False)
+        self.assertEqual(dasp.io.select(index, sr=48000, channels=2), ['stereo.wav'])
+
+        index = dasp.io.index(path)
+        self.assertEqual(dasp.io.select(index, sr=48000), ['mono.wav'])
+        self.assertEqual(index['stereo.wav']['bits'], 24)
+
+    def test_async(self):
+
+        paths = [f'/tmp/dasp_async_{i}' for i in range(3)]
+
+        async def run():
+            await asyncio.gather(*[dasp.io.write_async(path, self.x) for path in paths[:2]])
+            return await dasp.io.read_many_async(paths, concurrency=2, chunksize=1000)
+
+        results, errors = asyncio.run(run())
+
+        self.assertEqual(list(errors), paths[2:])
+
+        for path, (y, t, sr) in zip(paths[:2], results):
+            x, u, sr = dasp.io.read(path)
+            self.assertTrue(np.array_equal(x, y))
+            self.assertTrue(np.array_equal(t, u))
+
     def test_play(self):
 
         dasp.io.play('/tmp/dasp')
@@ -3,6 +3,7 @@ src = os.path.join(os.path.dirname(__file__), '..')
 sys.path.insert(0, src)
 
 import numpy as np
+import tempfile
 import unittest
 
 from dhbw import dasp
@@ -30,6 +31,188 @@ class StftTest(unittest.TestCase):
 
         self.assertTrue(np.allclose(x, y))
 
+    def test_chunks(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        for w, h in [(1024, 256), (1000, 300), (256, 512)]:
+
+            z = dasp.stft.stft(x, w, h)
+            y = dasp.stft.istft(z, w, h)
+
+            self.assertTrue(np.array_equal(z, dasp.stft.stft(x, w, h, chunksize=7)))
+            self.assertTrue(np.array_equal(y, dasp.stft.istft(z, w, h, chunksize=7)))
+
+    def test_axis(self):
+
+        w = 1024
+        h = w//4
+
+        t = dasp.timeline(1)
+        x = np.stack([dasp.signal.noise(t) for _ in range(2)], axis=-1)
+
+        for axis in [0, -2]:
+
+            z = dasp.stft.stft(x, w, h, axis=axis)
+            y = dasp.stft.istft(z, w, h, axis=axis)
+
+            self.assertEqual(z.shape[-1], 2)
+            self.assertEqual(y.shape[-1], 2)
+
+            for i in range(2):
+                self.assertTrue(np.array_equal(z[..., i], dasp.stft.stft(x[..., i], w, h)))
+                self.assertTrue(np.array_equal(y[..., i], dasp.stft.istft(z[..., i], w, h)))
+
+        z = dasp.stft.stft(x.T, w, h, axis=-1)
+        y = dasp.stft.istft(z, w, h, axis=-1)
+
+        self.assertTrue(np.array_equal(z[0], dasp.stft.stft(x[:, 0], w, h)))
+        self.assertTrue(np.array_equal(y[0], dasp.stft.istft(z[0], w, h)))
+
+    def test_dtype(self):
+
+        w = 1024
+        h = w//4
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        z = dasp.stft.stft(x, w, h)
+        y = dasp.stft.istft(z, w, h)
+
+        z32 = dasp.stft.stft(x.astype(np.float32), w, h, dtype=np.complex64)
+        y32 = dasp.stft.istft(z32, w, h, dtype=np.float32)
+
+        self.assertEqual(z32.dtype, np.complex64)
+        self.assertEqual(y32.dtype, np.float32)
+
+        # single precision accuracy bounds
+        self.assertLess(np.max(np.abs(z - z32)), 1e-7)
+        self.assertLess(np.max(np.abs(y - y32)), 1e-6)
+
+    def test_workers(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        z = dasp.stft.stft(x, 1024, 256)
+
+        for workers in [2, 4]:
+            self.assertTrue(np.array_equal(z, dasp.stft.stft(x, 1024, 256, workers=workers)))
+
+    def test_backend(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        z = dasp.stft.stft(x, 1024, 256)
+        y = dasp.stft.istft(z, 1024, 256)
+
+        for backend in dasp.fft.backend.names():
+
+            self.assertTrue(np.allclose(z, dasp.stft.stft(x, 1024, 256, backend=backend)))
+            self.assertTrue(np.allclose(y, dasp.stft.istft(z, 1024, 256, backend=backend)))
+
+    def test_out(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+        x = np.stack((x, -x), axis=-1)
+
+        z = dasp.stft.stft(x, 1024, 256)
+
+        with tempfile.TemporaryDirectory() as temp:
+
+            samples = os.path.join(temp, 'samples.npy')
+            dfts = os.path.join(temp, 'dfts.npy')
+
+            np.save(samples, x)
+
+            y = dasp.stft.stft(np.load(samples, mmap_mode='r'), 1024, 256, chunksize=7, out=dfts)
+
+            self.assertIsInstance(y, np.memmap)
+            self.assertTrue(np.array_equal(z, y))
+            self.assertTrue(np.array_equal(z, np.load(dfts, mmap_mode='r')))
+
+            del y
+
+        y = np.empty_like(z)
+
+        self.assertIs(dasp.stft.stft(x, 1024, 256, out=y), y)
+        self.assertTrue(np.array_equal(z, y))
+
+    def test_analyzer(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        for w, h in [(1024, 256), (256, 512)]:
+
+            analyzer = dasp.stft.Analyzer(w, h)
+            blocks = np.split(x, np.cumsum(np.random.randint(1, 3 * w, 100)))
+
+            y = np.concatenate([analyzer.push(block) for block in blocks])
+            z = dasp.stft.stft(x, w, h)
+
+            self.assertTrue(np.array_equal(y, z))
+
+    def test_synthesizer(self):
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        for w, h in [(1024, 256), (1000, 300), (256, 512)]:
+
+            synthesizer = dasp.stft.Synthesizer(w, h)
+
+            z = dasp.stft.stft(x, w, h)
+            blocks = np.split(z, np.cumsum(np.random.randint(0, 5, 100)))
+
+            y = np.concatenate([synthesizer.push(block) for block in blocks] + [synthesizer.flush()])
+            z = dasp.stft.istft(z, w, h)
+
+            self.assertTrue(np.array_equal(y, z))
+
+    def test_welch(self):
+
+        import scipy.signal
+
+        t = dasp.timeline(1)
+        x = dasp.signal.noise(t)
+
+        f, p = scipy.signal.welch(x, dasp.SR, 'hann', 1024, 1024 - 256, detrend=False)
+
+        welch = dasp.stft.Welch(1024, 256)
+
+        for block in np.array_split(x, 7):
+            welch.push(block)
+
+        g, q = welch.psd()
+
+        self.assertTrue(np.allclose(f, g))
+        self.assertTrue(np.allclose(p, q))
+        self.assertTrue(np.allclose(10 * np.log10(p), welch.psd(db=True)[1]))
+
+        with self.assertRaises(AssertionError):
+            welch.push(np.stack((x, x), axis=-1))
+
+        for framesize, hopsize in [(1024, 256), (256, 512)]:
+
+            serial = dasp.stft.Welch(framesize, hopsize).push(x)
+
+            parts = [dasp.stft.Welch(framesize, hopsize).push(part)
+                     for part in np.split(x, [hopsize * 3, hopsize * 40, hopsize * 41])]
+
+            merged = parts[0]
+
+            for part in parts[1:]:
+                merged.merge(part)
+
+            self.assertEqual(merged.count, serial.count)
+            self.assertEqual(merged.length, len(x))
+            self.assertTrue(np.allclose(merged.psd()[1], serial.psd()[1], rtol=1e-12, atol=0))
+
 if __name__ == '__main__':
 
     unittest.main()